@@ -51,7 +51,7 @@ i.e.:
     combined motor position = motor1 * position coefficient1 + motor2 * position coefficient2 + ....
 
 Important:
-both coefficients must obey condition:
+both coefficients must obey condition (checked at init of the device):
 1 = coupling coefficients1 * position coefficient1 + coupling coefficients2 * position coefficient2 + ...
 
 Examples:
@@ -86,6 +86,43 @@ Examples:
         position coefficient 2 = 0
 
 
+Several virtual axes on one set of motors (e.g. height, pitch, roll of 3-legs table):
+set MOTORS to the list of tango addresses of motors and AXES to the list of
+(<axis name>, [<position coefficient1>, <position coefficient2>, ...]) tuples, i.e.:
+    axis position = motor1 * position coefficient1 + motor2 * position coefficient2 + ....
+
+The coupling coefficients are then calculated as pseudo-inverse of the position coefficients matrix,
+so the position coefficients of different axes must be linearly independent.
+Each axis is exposed as attribute with axis name, Position is the first axis, AxesPosition returns
+all axes at once and MoveAxes moves all axes simultaneously.
+
+Example:
+    For table with 3 legs y1, y2 (front), y3 (back)
+        MOTORS = ['y1', 'y2', 'y3']
+        AXES = [('Height', [1/3., 1/3., 1/3.]),
+                ('Pitch', [0.5, 0.5, -1]),
+                ('Roll', [1, -1, 0])]
+
+Nonlinear kinematics (tilt tables, Bragg geometries, trigonometric legs): set MOTORS to the list of tango
+addresses of motors, optionally AXES to the list of axis names, and define vectorized functions:
+    forward(positions) - motors positions [motor] or [motor, point] -> axes positions [axis] or [axis, point]
+    inverse(axes, positions) - axes positions [axis] or [axis, point] and current motors positions [motor]
+                               -> motors positions [motor] or [motor, point]
+    jacobian(positions) - optional, d axes/d motors [axis][motor] at motors positions [motor],
+                          if not given it is calculated numerically
+Whole trajectory is converted in one call of inverse. Limits and speed parameters are scaled with
+the coupling, linearized at the current position.
+
+Example:
+    For Bragg angle (Theta) of crystal, tilted by linear motor z on lever of 100 mm
+        import numpy as np
+        MOTORS = ['z']
+        AXES = ['Theta']
+        def forward(positions):
+            return np.degrees(np.arcsin(np.asarray(positions)/100.))
+        def inverse(axes, positions):
+            return 100.*np.sin(np.radians(axes))
+
 Limits for motion taken correctly from soft limits of physical motors.
 Change of limits of virtual motor is not allowed
 
@@ -110,12 +147,46 @@ ATTRIBUTES_LOGIC = {'Acceleration': 'sum',
 
 SHOWN_CONVERSION = 10000
 
+# attributes of sub-motors, scaled during coordinated move
+PROFILE_ATTRIBUTES = ['SlewRate', 'Acceleration', 'BaseRate']
+
+# attributes of sub-motors, needed for kinematics and limits calculation
+LIMITS_SNAPSHOT = ['Position', 'UnitLimitMin', 'UnitLimitMax']
+
+# attributes of all sub-motors, read in one go to convert and check trajectory
+TRAJECTORY_SNAPSHOT = LIMITS_SNAPSHOT + ['Conversion']
+
+# period (s) of State check, while waiting for the end of move
+MOVE_POLL_PERIOD = 0.1
+
+# time (s), within which sub-motors must report MOVING or reach the targets after the move start
+MOVE_START_TIMEOUT = 1.
+
+# time (s), which delete_device waits for the end of step scan and trajectory stream
+THREAD_STOP_TIMEOUT = 5.
+
+# attributes, for which the device pushes change and archive events
+PUSHED_ATTRIBUTES = ['Position', 'State', 'CwLimit', 'CcwLimit']
+
+# attributes of sub-motors, served from cache, which is fed by events and by the background poller
+MOTOR_ATTRIBUTES = ['Position', 'State', 'CwLimit', 'CCwLimit', 'UnitLimitMin', 'UnitLimitMax']
+
 import PyTango
 import sys
+import threading
+import time
 import os
 import importlib
 import numpy as np
 
+from collections import deque
+
+from MotorGroup import MotorGroup
+from MotorKinematics import LinearKinematics, NonlinearKinematics
+
+# states of sub-motors, passed to VM, in order of priority
+STATE_PRIORITY = [PyTango.DevState.FAULT, PyTango.DevState.MOVING, PyTango.DevState.ALARM]
+
 class CombinedMotor(PyTango.Device_4Impl):
 
     def __init__(self, cl, name):
@@ -125,9 +196,25 @@ class CombinedMotor(PyTango.Device_4Impl):
 
     def delete_device(self):
         self.debug_stream("In delete_device()")
+        self._stop_trajectory_stream()
+        self._scan_stop.set()
+
+        # scan and stream threads use the group till they finish the current step
+        for thread in [self._scan_thread, self._stream_thread]:
+            if thread is not None:
+                thread.join(THREAD_STOP_TIMEOUT)
+                if thread.is_alive():
+                    self.warn_stream('Scan or trajectory stream is still running, sub-motors are released anyway')
+
+        self._group.close()
 
     def init_device(self):
         self.debug_stream("In init_device()")
+
+        # duration of startup phases, logged at the end
+        timings = []
+        phase_start = time.time()
+
         self.get_device_properties(self.get_device_class())
         self._position_sim = 0.0
 
@@ -141,36 +228,189 @@ class CombinedMotor(PyTango.Device_4Impl):
             basename = basename.rpartition('.')[0]
 
         try:
-            _motors_definition = importlib.import_module(basename).MOTORS
+            _motors_code = importlib.import_module(basename)
+            _motors_definition = _motors_code.MOTORS
         except Exception as err:
             # print(err)
             PyTango.Except.throw_exception("CombinedMotor", 'Cannot import MOTORS from {} due to {}'.format(basename, err), "CombinedMotor")
 
+        # --------------------------------------------------------
+        # kinematics coefficients: axes = position_matrix x motors, motors shift = coupling_matrix x axes shift
+        # --------------------------------------------------------
+        try:
+            if hasattr(_motors_code, 'forward') and hasattr(_motors_code, 'inverse'):
+                motor_names = list(_motors_definition)
+                self._axes = list(getattr(_motors_code, 'AXES', []))
+                self._kinematics = NonlinearKinematics(_motors_code.forward, _motors_code.inverse,
+                                                       getattr(_motors_code, 'jacobian', None),
+                                                       max(len(self._axes), 1))
+            elif hasattr(_motors_code, 'AXES'):
+                motor_names = list(_motors_definition)
+                self._axes = [name for name, _ in _motors_code.AXES]
+                self._kinematics = LinearKinematics([coefficients for _, coefficients in _motors_code.AXES])
+            else:
+                motor_names = [name for name, _, _ in _motors_definition]
+                self._axes = []
+                self._kinematics = LinearKinematics([[position for _, _, position in _motors_definition]],
+                                                    [[coupling] for _, coupling, _ in _motors_definition])
+
+            if isinstance(self._kinematics, LinearKinematics) and \
+                    self._kinematics.position_matrix.shape[1] != len(motor_names):
+                raise ValueError('Number of coefficients does not match number of motors')
+        except ValueError as err:
+            PyTango.Except.throw_exception("CombinedMotor", 'Wrong coefficients in {}: {}'.format(basename, err),
+                                           "CombinedMotor")
 
         # --------------------------------------------------------
         # making real motor proxies
         # --------------------------------------------------------
-        self._motors = []
-        for name, coupling, position in _motors_definition:
-            try:
-                self._motors.append((PyTango.DeviceProxy(name), coupling, position))
-            except:
-                PyTango.Except.throw_exception("vm", 'Cannot find {} motor'.format(name), "VmExecutor")
+        self._group = MotorGroup(motor_names)
+
+        timings.append(('properties', time.time() - phase_start))
+        phase_start = time.time()
+
+        # motors are connected and subscribed in parallel, at once for all attributes, which are served from cache,
+        # the unreachable ones will be connected at the first access
+        unreachable = self._group.connect(MOTOR_ATTRIBUTES + list(ATTRIBUTES_LOGIC.keys()) + ['Conversion'])
+        if unreachable:
+            self.warn_stream('Cannot connect {}, will retry at first access'.format(', '.join(unreachable)))
+
+        timings.append(('connection', time.time() - phase_start))
+        phase_start = time.time()
+
+        # motion profile of sub-motors, saved before coordinated move, to be restored after it
+        self._coordinated_move = False
+        self._saved_profile = None
+        # re-entrant: held for the whole scale-and-write step, which itself saves and restores the profile
+        self._profile_lock = threading.RLock()
+
+        # streamed trajectory: chunks of converted trajectory, waiting to be sent to sub-motors
+        self._stream = deque()
+        self._stream_points = 0
+        self._stream_snapshot = None
+        self._stream_thread = None
+        self._stream_lock = threading.Lock()
+
+        # step scan, executed by the device itself: [index, position] of the last reached point
+        self._scan_thread = None
+        self._scan_stop = threading.Event()
+        self._scan_point = [-1, np.nan]
+
+        # notified on each State event of sub-motors, _wait_move_done waits for it
+        self._state_changed = threading.Condition()
+
+        # result of the last MoveTo, pushed as user event at the end of move
+        self._move_result = ''
+
+        # Position, State and limit flags of sub-motors are served from cache, fed by change events,
+        # each event of sub-motor is converted to the event of VM
+        for name in PUSHED_ATTRIBUTES:
+            self.set_change_event(name, True, False)
+            self.set_archive_event(name, True, False)
+
+        self._events_lock = threading.Lock()
+        self._last_events = {}
+
+        self._group.max_age = self.CacheMaxAge
+        self._group.add_listener(self._on_motor_event)
+        self._group.subscribe(MOTOR_ATTRIBUTES)
+
+        # sub-motors, which do not send events, are polled in background
+        if self.PollPeriodIdle > 0:
+            self._group.start_polling(MOTOR_ATTRIBUTES, self.PollPeriodMoving, self.PollPeriodIdle)
+
+        # speed parameters and Conversion are cached, the cache is filled by the settings check below
+        self._group.keep(list(ATTRIBUTES_LOGIC.keys()) + ['Conversion'])
+
+        timings.append(('subscription', time.time() - phase_start))
+        phase_start = time.time()
 
         self.set_state(PyTango.DevState.ON)
 
-        # Create a proxy to the own device for setting Position properties
-        self.dev = PyTango.DeviceProxy(self.get_name())
+        # last limits, propagated to the Position attribute config
+        self._position_limits = None
 
+        # last calculated limits, valid till positions or limits of sub-motors change: {axis: (snapshot, limits)}
+        self._limits_cache = {}
 
-        # Checking whether sub-motors have equal settings
+        # Checking whether sub-motors settings can be read: all of them in one go,
+        # with unreachable motors the check is skipped, their settings are read at first access
+        if not unreachable:
+            self._group.read(list(ATTRIBUTES_LOGIC.keys()) + ['Conversion'], use_cache=False)
 
-        for attribute in ATTRIBUTES_LOGIC.keys():
-            self._get_attribute(attribute)
+        timings.append(('settings check', time.time() - phase_start))
+        self.info_stream('Startup: {}'.format(', '.join('{} {:.3f} s'.format(phase, duration)
+                                                        for phase, duration in timings)))
 
     def always_executed_hook(self):
         self.debug_stream("In always_excuted_hook()")
 
+    # -----------------------------------------------------------------------------
+    #    Events
+    # -----------------------------------------------------------------------------
+
+    def _on_motor_event(self, index, attribute):
+        # called by MotorGroup each time one of sub-motors sends an event
+
+        try:
+            if attribute == 'Position':
+                self._push_event('Position', self._real_motors_to_vm())
+            elif attribute == 'State':
+                self._push_event('State', self._get_state())
+                with self._state_changed:
+                    self._state_changed.notify_all()
+                self._restore_motion_profile()
+            elif attribute == 'CwLimit':
+                self._push_event('CwLimit', self._get_limit_flag('CwLimit'))
+            elif attribute == 'CCwLimit':
+                self._push_event('CcwLimit', self._get_limit_flag('CCwLimit'))
+        except PyTango.DevFailed as err:
+            self.debug_stream("Cannot push event for {}: {}".format(attribute, err))
+
+    # -----------------------------------------------------------------------------
+    def _push_event(self, name, value):
+
+        with self._events_lock:
+            last_value = self._last_events.get(name)
+            if name == 'Position':
+                changed = self._position_changed(value, last_value)
+            else:
+                changed = last_value is None or value != last_value
+
+            if not changed:
+                return
+
+            self._last_events[name] = value
+            if name == 'State':
+                self.set_state(value)
+                self.push_change_event('State')
+                self.push_archive_event('State')
+            else:
+                self.push_change_event(name, value)
+                self.push_archive_event(name, value)
+
+    # -----------------------------------------------------------------------------
+    def _position_changed(self, value, last_value):
+        # applies EventAbsChange/EventRelChange deadbands, if both are 0 - any change is pushed
+
+        if last_value is None:
+            return True
+
+        change = abs(value - last_value)
+        if change == 0:
+            return False
+
+        if self.EventAbsChange <= 0 and self.EventRelChange <= 0:
+            return True
+
+        if 0 < self.EventAbsChange <= change:
+            return True
+
+        if self.EventRelChange > 0 and last_value != 0 and 100. * change / abs(last_value) >= self.EventRelChange:
+            return True
+
+        return False
+
     # -----------------------------------------------------------------------------
     #    Motor related read/write attribute methods
     # -----------------------------------------------------------------------------
@@ -185,10 +425,34 @@ class CombinedMotor(PyTango.Device_4Impl):
     def write_Position(self, attr):
 
         self.debug_stream("In write_Position()")
-        new_position = attr.get_write_value()
+        self._move_axis(attr.get_write_value(), 0)
+
+    # -----------------------------------------------------------------------------
+    def read_Axis(self, attr):
+
+        self.debug_stream("In read_Axis()")
+        attr.set_value(self._real_motors_to_vm(axis=self._axes.index(attr.get_name())))
+
+    # -----------------------------------------------------------------------------
+    def write_Axis(self, attr):
+
+        self.debug_stream("In write_Axis()")
+        self._move_axis(attr.get_write_value(), self._axes.index(attr.get_name()))
 
-        min_value = self._get_limit_min()
-        max_value = self._get_limit_max()
+    # -----------------------------------------------------------------------------
+    def read_AxesPosition(self, attr):
+
+        self.debug_stream("In read_AxesPosition()")
+        positions = self._kinematics.forward(self._group.read(['Position'])['Position'])
+        attr.set_value(positions, len(positions))
+
+    # -----------------------------------------------------------------------------
+    def _move_axis(self, new_position, axis):
+
+        # one batched read of all sub-motors is used for limits check and kinematics
+        snapshot = self._group.read(LIMITS_SNAPSHOT, use_cache=False)
+
+        min_value, max_value = self._get_limits(snapshot, axis)
 
         if new_position < min_value or new_position > max_value:
             PyTango.Except.throw_exception("write_Position",
@@ -196,72 +460,173 @@ class CombinedMotor(PyTango.Device_4Impl):
                                                min_value) + ", max: " + str(max_value) + ")",
                                            "VmExecutor")
 
-        for (motor_proxy, _, _), new_position in zip(self._motors, self._vm_to_real_motors(new_position)):
-            motor_proxy.Position = new_position
+        new_positions = self._vm_to_real_motors(new_position, snapshot, axis)
+        self._check_motor_limits("write_Position", new_positions, snapshot)
+
+        self._move_motors(new_positions, snapshot)
 
+        return new_positions
 
     # -----------------------------------------------------------------------------
-    def read_CwLimit(self, attr):
+    def _check_motor_limits(self, reason, new_positions, snapshot):
+        # targets of sub-motors, [motor] or [motor, point], are checked against their own limits:
+        # the VM limits do not guarantee it for all kinematics
+
+        new_positions = np.reshape(new_positions, (len(self._group), -1)).T
+        out_of_limits = np.any((new_positions < snapshot['UnitLimitMin']) | (new_positions > snapshot['UnitLimitMax']),
+                               axis=0)
+        if np.any(out_of_limits):
+            PyTango.Except.throw_exception(reason,
+                                           "Positions are out of limits of {}".format(
+                                               ', '.join(np.array(self._group.names)[out_of_limits])),
+                                           "CombinedMotor")
 
-        self.debug_stream("In read_CwLimit()")
+    # -----------------------------------------------------------------------------
+    def _move_motors(self, new_positions, snapshot):
+        # the profile cannot be restored (by State event or dev_state) between its scaling and the move start
 
-        no_limit = True
-        #
-        # if one of the motors is in the limit return 1
-        #
-        for proxy, _, _ in self._motors:
-            no_limit *= proxy.CwLimit == 0
+        with self._profile_lock:
+            if self._coordinated_move:
+                self._scale_motion_profile(snapshot['Position'], new_positions)
+
+            self._group.write('Position', new_positions)
+
+    # -----------------------------------------------------------------------------
+    def read_CoordinatedMove(self, attr):
+
+        self.debug_stream("In read_CoordinatedMove()")
+        attr.set_value(self._coordinated_move)
+
+    # -----------------------------------------------------------------------------
+    def write_CoordinatedMove(self, attr):
+
+        self.debug_stream("In write_CoordinatedMove()")
+        self._coordinated_move = attr.get_write_value()
+
+    # -----------------------------------------------------------------------------
+    def _scale_motion_profile(self, positions, new_positions):
+        ###
+        # all motors get the same velocity profile, normalized by their travel: they start and arrive together,
+        # and VM stays on the coupling line during move. The normalized profile is the fastest one, which
+        # does not exceed SlewRate/Acceleration/BaseRate of any motor
+        ###
+        self._restore_motion_profile()
+
+        # the profile, which will be restored after the move, is read directly: the settings cache
+        # is not updated by motors without settings events, Conversion is taken from cache
+        profile = self._group.read(PROFILE_ATTRIBUTES, use_cache=False)
+        profile['Conversion'] = self._group.read(['Conversion'])['Conversion']
+
+        travel = np.abs(np.array(new_positions) - positions)*np.abs(profile['Conversion'])
+        moving = travel > 0
+        if np.count_nonzero(moving) < 2:
+            return
+
+        with self._profile_lock:
+            # the whole original profile is saved before the first write: if a write fails, motors,
+            # which were already written, are restored at once or, if it fails too, by the next State event
+            self._saved_profile = dict((name, profile[name]) for name in PROFILE_ATTRIBUTES)
+            try:
+                for name in PROFILE_ATTRIBUTES:
+                    values = profile[name]
+                    normalized = np.min(np.abs(values[moving])/travel[moving])
+                    scaled = np.where(moving, travel*normalized*np.sign(values), values)
+                    if np.issubdtype(values.dtype, np.integer):
+                        scaled = np.where(moving, np.maximum(np.abs(np.round(scaled)), 1)*np.sign(values),
+                                          values).astype(values.dtype)
+
+                    self._group.write(name, scaled)
+            except PyTango.DevFailed as err:
+                try:
+                    self._restore_motion_profile()
+                except PyTango.DevFailed:
+                    self.error_stream('Cannot restore motion profile of sub-motors, it is retried at next State event')
+                raise err
+
+    # -----------------------------------------------------------------------------
+    def _restore_motion_profile(self):
+        # restores profile, saved before coordinated move, as soon as no sub-motor is moving
+
+        with self._profile_lock:
+            if self._saved_profile is None:
+                return
+
+            # cached State can be not yet updated right after the move start, so here it is read directly
+            states = self._group.read(['State'], use_cache=False)['State']
+            if np.any(states == PyTango.DevState.MOVING):
+                return
+
+            for name, values in self._saved_profile.items():
+                self._group.write(name, values)
+            self._saved_profile = None
+
+    # -----------------------------------------------------------------------------
+    def read_CwLimit(self, attr):
 
-        attr.set_value(not no_limit)
+        self.debug_stream("In read_CwLimit()")
+        attr.set_value(self._get_limit_flag('CwLimit'))
 
 
     # -----------------------------------------------------------------------------
     def read_CcwLimit(self, attr):
 
         self.debug_stream("In read_CcwLimit()")
-        no_limit = True
-        #
-        # if one of the motors is in the limit return 1
-        #
-        for proxy, _, _ in self._motors:
-            no_limit *= proxy.CCwLimit == 0
-
-        attr.set_value(not no_limit)
+        attr.set_value(self._get_limit_flag('CCwLimit'))
 
 
     # -----------------------------------------------------------------------------
     def read_UnitLimitMin(self, attr):
 
         self.debug_stream("In read_UnitLimitMin()")
-        self.attr_UnitLimitMin_read = self._get_limit_min()
+        limit_min, _ = self._update_position_limits()
+        attr.set_value(limit_min)
 
-        cfg = []
-        config = self.dev.get_attribute_config("Position")
-        config.min_value = str(self.attr_UnitLimitMin_read)
 
-        cfg.append(config)
+    # -----------------------------------------------------------------------------
+    def read_UnitLimitMax(self, attr):
 
-        self.dev.set_attribute_config(cfg)
+        self.debug_stream("In read_UnitLimitMax()")
+        _, limit_max = self._update_position_limits()
+        attr.set_value(limit_max)
 
-        attr.set_value(self.attr_UnitLimitMin_read)
+    # -----------------------------------------------------------------------------
+    def read_Limits(self, attr):
 
+        self.debug_stream("In read_Limits()")
+        attr.set_value(list(self._update_position_limits()))
 
     # -----------------------------------------------------------------------------
-    def read_UnitLimitMax(self, attr):
+    def _update_position_limits(self):
+        # calculates limits of VM and sets them as min/max value of the Position attribute,
+        # the attribute config (and the DB) is touched only if the limits have changed
 
-        self.debug_stream("In read_UnitLimitMax()")
+        snapshot = self._group.read(LIMITS_SNAPSHOT)
+        limits = self._get_limits(snapshot)
 
-        unit_limit_max = self._get_limit_max()
+        if limits != self._position_limits:
+            attribute = self.get_device_attr().get_w_attr_by_name('Position')
 
-        cfg = []
-        config = self.dev.get_attribute_config("Position")
-        config.max_value = str(unit_limit_max)
+            # a limit, which is not found (infinite), is not set
+            setters = [(attribute.set_min_value, limits[0]), (attribute.set_max_value, limits[1])]
+            try:
+                for setter, limit in setters:
+                    if np.isfinite(limit):
+                        setter(limit)
+            except PyTango.DevFailed:
+                # new min is above the old max, so the max has to be set first
+                for setter, limit in reversed(setters):
+                    if np.isfinite(limit):
+                        setter(limit)
 
-        cfg.append(config)
+            self._position_limits = limits
 
-        self.dev.set_attribute_config(cfg)
+        return limits
 
-        attr.set_value(unit_limit_max)
+    # -----------------------------------------------------------------------------
+    def read_StartSkew(self, attr):
+
+        self.debug_stream("In read_StartSkew()")
+        attr.set_value(self._group.start_skew*1e3)
 
     # -----------------------------------------------------------------------------
     def read_PositionSim(self, attr):
@@ -281,7 +646,7 @@ class CombinedMotor(PyTango.Device_4Impl):
 
         self.debug_stream("In read_ResultSim()")
         _answer = []
-        for (proxy, _, _), position in zip(self._motors, self._vm_to_real_motors(self._position_sim)):
+        for proxy, position in zip(self._group.proxies, self._vm_to_real_motors(self._position_sim)):
             _answer.append("{}: {}".format(proxy.name(), position))
 
         attr.set_value(_answer, len(_answer))
@@ -292,15 +657,42 @@ class CombinedMotor(PyTango.Device_4Impl):
 
     def _set_attribute(self, name, value):
 
-        value /= SHOWN_CONVERSION
-        for proxy, coupling, _ in self._motors:
-            setattr(proxy, name, value*coupling*np.sign(getattr(proxy, name))*np.abs(proxy.conversion))
+        self._group.write(name, self._motor_values(name, value, self._group.read([name, 'Conversion', 'Position'])))
+
+    # -----------------------------------------------------------------------------
+    def _speed_coefficients(self, snapshot):
+        # speed parameters are scaled according to the first axis (Position of VM),
+        # for nonlinear kinematics the coefficients depend on the current position
+        # returns (coupling, position coefficients) of motors
+
+        position_matrix, coupling_matrix = self._kinematics.local(snapshot['Position'])
+
+        return coupling_matrix[:, 0], position_matrix[0]
+
+    # -----------------------------------------------------------------------------
+    def _motor_values(self, name, value, snapshot):
+        # converts VM value of speed parameter to values of sub-motors,
+        # sign, Conversion and Position of each motor are taken from snapshot, integer attributes stay integer
+
+        coupling, _ = self._speed_coefficients(snapshot)
+
+        values = value/SHOWN_CONVERSION*coupling*np.sign(snapshot[name])*np.abs(snapshot['Conversion'])
+        if np.issubdtype(np.asarray(snapshot[name]).dtype, np.integer):
+            values = np.round(values).astype(int)
+
+        return values
 
     # -----------------------------------------------------------------------------
     def _get_attribute(self, name):
 
-        return SHOWN_CONVERSION*getattr(np, ATTRIBUTES_LOGIC[name])([getattr(proxy, name)/(scale*np.abs(proxy.conversion))
-                                                               if scale != 0 else 0 for proxy, _, scale in self._motors])
+        snapshot = self._group.read([name, 'Conversion', 'Position'])
+        _, position_coef = self._speed_coefficients(snapshot)
+
+        involved = position_coef != 0
+        values = np.zeros(len(position_coef))
+        values[involved] = snapshot[name][involved]/(position_coef[involved]*np.abs(snapshot['Conversion'][involved]))
+
+        return SHOWN_CONVERSION*getattr(np, ATTRIBUTES_LOGIC[name])(values)
 
 
     # -----------------------------------------------------------------------------
@@ -374,18 +766,13 @@ class CombinedMotor(PyTango.Device_4Impl):
     def read_FlagClosedLoop(self, attr):
 
         self.debug_stream("In read_FlagClosedLoop()")
-        values = []
-        for proxy, _, _ in self._motors:
-            values.append(proxy.FlagClosedLoop)
-
-        attr.set_value(1 if np.any(np.array(values)) else 0)
+        attr.set_value(1 if np.any(self._group.read(['FlagClosedLoop'])['FlagClosedLoop']) else 0)
 
     # -----------------------------------------------------------------------------
     def write_FlagClosedLoop(self, attr):
 
         self.debug_stream("In write_FlagClosedLoop()")
-        for proxy, _, _ in self._motors:
-            proxy.FlagClosedLoop = attr.get_write_value()
+        self._group.write('FlagClosedLoop', [attr.get_write_value()]*len(self._group))
 
     # -----------------------------------------------------------------------------
     #    Support of dynamic attribute
@@ -393,6 +780,11 @@ class CombinedMotor(PyTango.Device_4Impl):
 
     # -----------------------------------------------------------------------------
     def initialize_dynamic_attributes(self):
+        # each axis of multi-axes VM gets its own attribute
+        for name in self._axes:
+            self.add_attribute(PyTango.Attr(name, PyTango.DevDouble, PyTango.READ_WRITE),
+                               self.read_Axis, self.write_Axis)
+
         for attr in self.DynamicAttributes:
             attr = attr.replace("\"", "")
             attr = attr.split(',')
@@ -452,23 +844,8 @@ class CombinedMotor(PyTango.Device_4Impl):
         :rtype: PyTango.CmdArgType.DevState """
 
         self.debug_stream("In dev_state()")
-        argout = PyTango.DevState.ON
-
-        #
-        # if one device is in FAULT the VM is in FAULT too
-        #
-        for proxy, _, _ in self._motors:
-            if proxy.state() == PyTango.DevState.FAULT:
-                argout = PyTango.DevState.FAULT
-                break
-        if argout == PyTango.DevState.ON:
-            #
-            # if one device is MOVING the VM is MOVING too
-            #
-            for proxy, _, _ in self._motors:
-                if proxy.state() == PyTango.DevState.MOVING:
-                    argout = PyTango.DevState.MOVING
-                    break
+        self._restore_motion_profile()
+        argout = self._get_state()
 
         self.set_state(argout)
 
@@ -476,6 +853,27 @@ class CombinedMotor(PyTango.Device_4Impl):
             PyTango.Device_4Impl.dev_state(self)
         return self.get_state()
 
+    # -----------------------------------------------------------------------------
+    def _get_state(self):
+        #
+        # the state of VM is resolved from one snapshot of sub-motors states (served from cache):
+        # if one device is in FAULT the VM is in FAULT too, then MOVING, then ALARM
+        #
+        states = list(self._group.read(['State'])['State'])
+
+        for state in STATE_PRIORITY:
+            if state in states:
+                return state
+
+        return PyTango.DevState.ON
+
+    # -----------------------------------------------------------------------------
+    def _get_limit_flag(self, name):
+        #
+        # if one of the motors is in the limit return 1
+        #
+        return int(np.any(self._group.read([name])[name] != 0))
+
     # -----------------------------------------------------------------------------
     def Calibrate(self, argin):
         """ Re-defines the current position by changing the HomePosition, UnitCalibration, etc.
@@ -487,8 +885,8 @@ class CombinedMotor(PyTango.Device_4Impl):
 
         self.debug_stream("In Calibrate()")
         try:
-            for (proxy, coupling, _), position in zip(self._motors, self.vm_to_real_motors(argin)):
-                proxy.Calibrate(coupling*position)
+            snapshot = self._group.read(['Position'], use_cache=False)
+            self._group.command('Calibrate', list(self._vm_to_real_motors(argin, snapshot)))
             return True
         except:
             return False
@@ -509,8 +907,93 @@ class CombinedMotor(PyTango.Device_4Impl):
         :return:
         :rtype: PyTango.DevVoid """
         self.debug_stream("In StopMove()")
-        for proxy, _, _ in self._motors:
-            proxy.StopMove()
+        self._stop_trajectory_stream()
+        self._scan_stop.set()
+        self._group.command('StopMove')
+
+    # -----------------------------------------------------------------------------
+    def SetMotionProfile(self, argin):
+        """ Sets several speed parameters at once, with one write per motor
+
+        :param : argin: [[values], [names]], names from Acceleration, BaseRate, SlewRate, SlewRateMax,
+                        SlewRateMin, FlagClosedLoop
+        :type: PyTango.DevVarDoubleStringArray
+        :return:
+        :rtype: PyTango.DevVoid """
+        self.debug_stream("In SetMotionProfile()")
+
+        values, names = argin
+        if len(values) != len(names):
+            PyTango.Except.throw_exception("SetMotionProfile",
+                                           "Wrong argument, {} values for {} parameters".format(len(values), len(names)),
+                                           "CombinedMotor")
+
+        unknown = [name for name in names if name not in ATTRIBUTES_LOGIC]
+        if unknown:
+            PyTango.Except.throw_exception("SetMotionProfile",
+                                           "Wrong argument, unknown parameters: {}".format(', '.join(unknown)),
+                                           "CombinedMotor")
+
+        snapshot = self._group.read(list(names) + ['Conversion', 'Position'])
+
+        motor_values = {}
+        for name, value in zip(names, values):
+            if name == 'FlagClosedLoop':
+                motor_values[name] = [int(value)]*len(self._group)
+            else:
+                motor_values[name] = self._motor_values(name, value, snapshot)
+
+        self._group.write_attributes(motor_values)
+
+    # -----------------------------------------------------------------------------
+    def MoveAxes(self, argin):
+        """ Moves all axes simultaneously, with one write per motor
+
+        :param : argin: new positions of all axes
+        :type: PyTango.DevVarDoubleArray
+        :return:
+        :rtype: PyTango.DevVoid """
+        self.debug_stream("In MoveAxes()")
+
+        if len(argin) != len(self._kinematics):
+            PyTango.Except.throw_exception("MoveAxes", "{} positions expected".format(len(self._kinematics)),
+                                           "CombinedMotor")
+
+        snapshot = self._group.read(LIMITS_SNAPSHOT, use_cache=False)
+        new_positions = self._axes_to_real_motors(argin, snapshot)
+        self._check_motor_limits("MoveAxes", new_positions, snapshot)
+
+        self._move_motors(new_positions, snapshot)
+
+    # -----------------------------------------------------------------------------
+    def is_MoveAxes_allowed(self):
+        self.debug_stream("In is_MoveAxes_allowed()")
+        return self.get_state() not in [PyTango.DevState.MOVING, PyTango.DevState.FAULT]
+
+    # -----------------------------------------------------------------------------
+    def SimulateTrajectory(self, argin):
+        """ Calculates positions of sub-motors for an array of VM positions, without moving
+
+        :param : argin: VM positions
+        :type: PyTango.DevVarDoubleArray
+        :return: for each point: positions of sub-motors and 1 if one of them is out of limits, otherwise 0
+        :rtype: PyTango.DevVarDoubleArray """
+        self.debug_stream("In SimulateTrajectory()")
+
+        if len(argin) == 0:
+            PyTango.Except.throw_exception("SimulateTrajectory", "At least one position expected", "CombinedMotor")
+
+        ###
+        # all points are converted at once from one snapshot, the result is flattened [point, motor + flag] array
+        ###
+        snapshot = self._group.read(LIMITS_SNAPSHOT)
+        motors_positions = np.reshape(self._vm_to_real_motors(np.asarray(argin, dtype=float), snapshot),
+                                      (-1, len(argin))).T
+
+        out_of_limits = np.any((motors_positions < snapshot['UnitLimitMin']) |
+                               (motors_positions > snapshot['UnitLimitMax']), axis=1)
+
+        return np.column_stack((motors_positions, out_of_limits)).ravel()
 
     # -----------------------------------------------------------------------------
     def movevvc(self, argin):
@@ -522,91 +1005,426 @@ class CombinedMotor(PyTango.Device_4Impl):
         :rtype: PyTango.DevVoid """
         self.debug_stream("In movevvc()")
 
-        cmd_lists = [[], []]
-        for line in argin:
+        self._move_trajectory(*self._parse_trajectory(argin))
+
+    # -----------------------------------------------------------------------------
+    def MovevvcArray(self, argin):
+        """ Numeric version of movevvc
+
+        :param : argin: [slew1, position1, slew2, position2, ...]
+        :type: PyTango.DevVarDoubleArray
+        :return:
+        :rtype: PyTango.DevVoid """
+        self.debug_stream("In MovevvcArray()")
+
+        if len(argin) % 2:
+            PyTango.Except.throw_exception("MovevvcArray", "Trajectory must consist of (slew, position) pairs",
+                                           "CombinedMotor")
+
+        trajectory = np.reshape(argin, (-1, 2))
+        self._move_trajectory(trajectory[:, 0], trajectory[:, 1])
+
+    # -----------------------------------------------------------------------------
+    def _move_trajectory(self, slews, positions):
+        ###
+        # the whole trajectory is converted for all motors at once from one snapshot,
+        # motors, which have MovevvcArray get numeric trajectory, others - movevvc strings
+        ###
+        self._group.command(*self._convert_trajectory(slews, positions,
+                                                      self._group.read(TRAJECTORY_SNAPSHOT, use_cache=False)))
+
+    # -----------------------------------------------------------------------------
+    def _convert_trajectory(self, slews, positions, snapshot):
+        # returns (commands, arguments) for all sub-motors
+
+        motors_positions = self._vm_to_real_motors(positions, snapshot)
+        self._check_motor_limits("Trajectory", motors_positions, snapshot)
+        coupling, _ = self._speed_coefficients(snapshot)
+        motors_slews = np.outer(np.abs(coupling)*np.abs(snapshot['Conversion'])/SHOWN_CONVERSION, slews)
+
+        # sub-motors, which are VMs themselves, accept numeric trajectories
+        numeric_trajectory = self._group.has_command('MovevvcArray')
+
+        commands = []
+        arguments = []
+        for numeric, motor_slews, motor_positions in zip(numeric_trajectory, motors_slews, motors_positions):
+            if numeric:
+                commands.append('MovevvcArray')
+                arguments.append(np.column_stack((motor_slews, motor_positions)).ravel())
+            else:
+                commands.append('movevvc')
+                arguments.append(['slew: {}, position: {}'.format(slew, position)
+                                  for slew, position in zip(motor_slews, motor_positions)])
+
+        return commands, arguments
+
+    # -----------------------------------------------------------------------------
+    def AppendTrajectory(self, argin):
+        """ Appends segment to the streamed trajectory. Segments are converted at once and sent to sub-motors
+        in chunks of TrajectoryChunk points. Plain sub-motors (movevvc) get each chunk as soon as the previous
+        one is done, so the motion stops between chunks. Sub-motors, which have AppendTrajectory themselves,
+        get each chunk at once and move through the chunks without stops
+
+        :param : argin: [slew1, position1, slew2, position2, ...]
+        :type: PyTango.DevVarDoubleArray
+        :return:
+        :rtype: PyTango.DevVoid """
+        self.debug_stream("In AppendTrajectory()")
+
+        if len(argin) % 2:
+            PyTango.Except.throw_exception("AppendTrajectory", "Trajectory must consist of (slew, position) pairs",
+                                           "CombinedMotor")
+
+        trajectory = np.reshape(argin, (-1, 2))
+
+        with self._stream_lock:
+            # the trajectory moves VM along the coupling, which does not change the part of motor positions,
+            # taken from snapshot, so the snapshot taken at the start of stream is valid for all segments
+            snapshot = self._stream_snapshot
+            if snapshot is None:
+                snapshot = self._group.read(TRAJECTORY_SNAPSHOT, use_cache=False)
+
+            # the whole segment is converted and checked against limits before any of its chunks is queued
+            chunk = max(int(self.TrajectoryChunk), 1)
+            chunks = []
+            for start in range(0, len(trajectory), chunk):
+                points = trajectory[start:start + chunk]
+                chunks.append((len(points), self._convert_trajectory(points[:, 0], points[:, 1], snapshot),
+                               self._vm_to_real_motors(points[-1, 1], snapshot)))
+
+            self._stream_snapshot = snapshot
+            self._stream.extend(chunks)
+            self._stream_points += len(trajectory)
+
+            if self._stream_thread is None:
+                self._stream_thread = threading.Thread(target=self._feed_trajectory_stream)
+                self._stream_thread.daemon = True
+                self._stream_thread.start()
+
+    # -----------------------------------------------------------------------------
+    def MoveTo(self, argin):
+        """ Starts move of VM and returns immediately. As soon as all sub-motors have stopped,
+        user event of MoveResult is pushed
+
+        :param : argin: new position
+        :type: PyTango.DevDouble
+        :return:
+        :rtype: PyTango.DevVoid """
+        self.debug_stream("In MoveTo()")
+
+        targets = self._move_axis(argin, 0)
+        self._move_result = ''
+
+        thread = threading.Thread(target=self._watch_move, args=(targets,))
+        thread.daemon = True
+        thread.start()
+
+    # -----------------------------------------------------------------------------
+    def is_MoveTo_allowed(self):
+        self.debug_stream("In is_MoveTo_allowed()")
+        return self.get_state() not in [PyTango.DevState.MOVING, PyTango.DevState.FAULT]
+
+    # -----------------------------------------------------------------------------
+    def _watch_move(self, targets):
+        # waits for the end of move, started by MoveTo, and reports final position and error, if any
+
+        error = ''
+        try:
+            self._wait_move_done(targets)
+
+            state = self._get_state()
+            if state in [PyTango.DevState.FAULT, PyTango.DevState.ALARM]:
+                error = 'sub-motors are in {}'.format(state)
+
+            position = self._real_motors_to_vm(self._group.read(['Position'], use_cache=False))
+        except PyTango.DevFailed as err:
+            position = np.nan
+            error = err.args[0].desc
+
+        self._move_result = 'position: {}, error: {}'.format(position, error)
+        self.push_event('MoveResult', [], [], self._move_result)
+
+    # -----------------------------------------------------------------------------
+    def read_MoveResult(self, attr):
+
+        self.debug_stream("In read_MoveResult()")
+        attr.set_value(self._move_result)
+
+    # -----------------------------------------------------------------------------
+    def StepScan(self, argin):
+        """ Starts step scan, executed by the device: VM moves through the positions, waits the dwell time
+        at each of them and pushes user event of ScanPoint as soon as the point is reached
+
+        :param : argin: [position1, dwell1, position2, dwell2, ...], dwell in seconds
+        :type: PyTango.DevVarDoubleArray
+        :return:
+        :rtype: PyTango.DevVoid """
+        self.debug_stream("In StepScan()")
+
+        if len(argin) == 0 or len(argin) % 2:
+            PyTango.Except.throw_exception("StepScan", "Scan must consist of (position, dwell) pairs", "CombinedMotor")
+
+        if self._scan_thread is not None:
+            PyTango.Except.throw_exception("StepScan", "Another scan is running", "CombinedMotor")
+
+        scan = np.reshape(argin, (-1, 2))
+
+        ###
+        # all points are converted and checked against limits at once, from one snapshot
+        ###
+        snapshot = self._group.read(LIMITS_SNAPSHOT, use_cache=False)
+        targets = np.reshape(self._vm_to_real_motors(scan[:, 0], snapshot), (len(self._group), -1))
+
+        out_of_limits = (targets.T < snapshot['UnitLimitMin']) | (targets.T > snapshot['UnitLimitMax'])
+        if np.any(out_of_limits):
+            PyTango.Except.throw_exception("StepScan",
+                                           "Points {} are out of limits".format(
+                                               list(np.flatnonzero(np.any(out_of_limits, axis=1)))),
+                                           "CombinedMotor")
+
+        self._scan_stop.clear()
+        self._scan_point = [-1, np.nan]
+        self._scan_thread = threading.Thread(target=self._run_step_scan, args=(targets, scan[:, 1], snapshot['Position']))
+        self._scan_thread.daemon = True
+        self._scan_thread.start()
+
+    # -----------------------------------------------------------------------------
+    def is_StepScan_allowed(self):
+        self.debug_stream("In is_StepScan_allowed()")
+        return self.get_state() not in [PyTango.DevState.MOVING, PyTango.DevState.FAULT]
+
+    # -----------------------------------------------------------------------------
+    def _run_step_scan(self, targets, dwells, current):
+        # moves sub-motors from point to point, stops after the last point or by StopMove
+
+        try:
+            for index, dwell in enumerate(dwells):
+                if self._scan_stop.is_set():
+                    break
+
+                self._move_motors(targets[:, index], {'Position': current})
+                current = targets[:, index]
+                self._wait_move_done(current)
+
+                self._scan_point = [index, self._real_motors_to_vm()]
+                self.push_event('ScanPoint', [], [], self._scan_point)
+
+                self._scan_stop.wait(dwell)
+        except PyTango.DevFailed as err:
+            self.error_stream("Step scan is aborted: {}".format(err))
+        finally:
+            self._scan_thread = None
+
+    # -----------------------------------------------------------------------------
+    def read_ScanPoint(self, attr):
+
+        self.debug_stream("In read_ScanPoint()")
+        attr.set_value(self._scan_point)
+
+    # -----------------------------------------------------------------------------
+    def read_TrajectoryBuffer(self, attr):
+
+        self.debug_stream("In read_TrajectoryBuffer()")
+        attr.set_value(self._stream_points)
+
+    # -----------------------------------------------------------------------------
+    def _feed_trajectory_stream(self):
+        ###
+        # sends chunks of streamed trajectory to sub-motors one by one. Plain sub-motors (movevvc) get the next chunk
+        # only after the previous one is done, so they stop at the end of every chunk. Sub-motors, which stream
+        # trajectories themselves, get every chunk to their AppendTrajectory as soon as it is queued and keep moving
+        # between chunks, then the stream stays open (with its snapshot) till they stop
+        ###
+        forward = self._forwards_trajectory()
+        forwarded = None                    # (targets of the last forwarded chunk, time it was sent)
+
+        while True:
+            with self._stream_lock:
+                if not self._stream and forwarded is None:
+                    self._stream_snapshot = None
+                    self._stream_thread = None
+                    return
+                chunk = self._stream.popleft() if self._stream else None
+
+            if chunk is None:
+                if self._forwarded_stream_done(*forwarded):
+                    forwarded = None
+                continue
+
+            points, request, targets = chunk
+            try:
+                if forward:
+                    self._group.command('AppendTrajectory', request[1])
+                    forwarded = (targets, time.time())
+                else:
+                    self._group.command(*request)
+                    self._wait_move_done(targets)
+            except PyTango.DevFailed as err:
+                self.error_stream("Trajectory stream is aborted: {}".format(err))
+                self._stop_trajectory_stream()
+                forwarded = None
+
+            with self._stream_lock:
+                self._stream_points = max(self._stream_points - points, 0)
+
+    # -----------------------------------------------------------------------------
+    def _forwards_trajectory(self):
+        # True if all sub-motors of the trajectory stream trajectories themselves and accept numeric segments
+
+        appends = self._group.has_command('AppendTrajectory')
+        numeric = self._group.has_command('MovevvcArray')
+
+        return all(appends[index] and numeric[index] for index in range(len(self._group)))
+
+    # -----------------------------------------------------------------------------
+    def _forwarded_stream_done(self, targets, sent):
+        # waits for State event or MOVE_POLL_PERIOD, then checks if sub-motors have done all forwarded chunks:
+        # none of them is MOVING and they are at the targets of the last chunk or did not start in MOVE_START_TIMEOUT
+
+        self._wait_state_event()
+
+        try:
+            snapshot = self._group.read(['State', 'Position'], use_cache=False)
+            if np.any(snapshot['State'] == PyTango.DevState.MOVING):
+                return False
+
+            return self._at_targets(snapshot['Position'], targets) or \
+                time.time() - sent > MOVE_START_TIMEOUT
+        except PyTango.DevFailed as err:
+            self.error_stream("Trajectory stream is aborted: {}".format(err))
+            return True
+
+    # -----------------------------------------------------------------------------
+    def _stop_trajectory_stream(self):
+        # drops all not yet sent chunks, the feeder stops after the current one
+
+        with self._stream_lock:
+            self._stream.clear()
+            self._stream_points = 0
+            self._stream_snapshot = None
+
+    # -----------------------------------------------------------------------------
+    def _wait_move_done(self, targets=None, indices=None):
+        ###
+        # right after the write sub-motors can still be ON, so first the move start is confirmed, reading
+        # them directly: one of them is MOVING, or all of them are at targets (within one step), or
+        # MOVE_START_TIMEOUT has passed; then State is checked from cache each time a sub-motor sends State event,
+        # motors, which do not send events, are checked every MOVE_POLL_PERIOD
+        ###
+        deadline = time.time() + MOVE_START_TIMEOUT
+        while True:
+            snapshot = self._group.read(['State', 'Position'], use_cache=False)
+            if np.any(snapshot['State'] == PyTango.DevState.MOVING):
+                break
+
+            if targets is not None and self._at_targets(snapshot['Position'], targets, indices):
+                return
+
+            if time.time() > deadline:
+                return
+
+            self._wait_state_event()
+
+        states = snapshot['State']
+        while np.any(states == PyTango.DevState.MOVING):
+            self._wait_state_event()
+            states = self._group.read(['State'])['State']
+
+    # -----------------------------------------------------------------------------
+    def _wait_state_event(self):
+        # waits for State event of a sub-motor, but not longer than MOVE_POLL_PERIOD;
+        # the condition is held only here, so reads do not block the event callbacks
+
+        with self._state_changed:
+            self._state_changed.wait(MOVE_POLL_PERIOD)
+
+    # -----------------------------------------------------------------------------
+    def _at_targets(self, positions, targets, indices=None):
+        # True if sub-motors (all or indices) are at targets within one step
+
+        if indices is None:
+            indices = np.arange(len(self._group))
+
+        steps = 1./np.abs(self._group.read(['Conversion'])['Conversion'][indices])
+
+        return np.all(np.abs(positions[indices] - targets) <= steps)
+
+    # -----------------------------------------------------------------------------
+    def _parse_trajectory(self, argin):
+        # converts lines "slew: X, position: Y" to two arrays
+
+        slews = np.empty(len(argin))
+        positions = np.empty(len(argin))
+        for index, line in enumerate(argin):
             slew, pos = line.split(',')
-            slew = int(slew.split(':')[1].strip())
-            positions = self._vm_to_real_motors(float(pos.split(':')[1].strip()))
-            for cmd_list, pos, (motor, coupling, _) in zip(cmd_lists, positions, self._motors):
-                cmd_list.append('slew: {}, position: {}'.format(slew*np.abs(coupling)*np.abs(motor.conversion)/
-                                                                SHOWN_CONVERSION, pos))
+            slews[index] = int(slew.split(':')[1].strip())
+            positions[index] = float(pos.split(':')[1].strip())
 
-        for (motor_proxy, _, _), cmd_list in zip(self._motors, cmd_lists):
-            motor_proxy.movevvc(cmd_list)
+        return slews, positions
 
     # --------------------------------------------------------
     # real_motors_to_vm
     # --------------------------------------------------------
 
-    def _real_motors_to_vm(self):
+    def _real_motors_to_vm(self, snapshot=None, axis=0):
         ###
-        # this function returns the position of slit according to the current mode
+        # this function returns the position of VM axis: sum of motor positions, weighted by position coefficients
         ###
-        value = 0
-        for motor, _, scale in self._motors:
-            value += motor.Position*scale
+        if snapshot is None:
+            snapshot = self._group.read(['Position'])
 
-        return value
+        return self._kinematics.forward(snapshot['Position'], axis)
 
     # --------------------------------------------------------
     # vm_to_real_motors
     # --------------------------------------------------------
 
-    def _vm_to_real_motors(self, new_position):
+    def _vm_to_real_motors(self, new_position, snapshot=None, axis=0):
         ###
-        # this function returns the position real motors from the position of slits according to the current mode
+        # this function returns the positions of real motors for the new position of VM axis,
+        # for an array of new positions it returns an array [motor, point]
         ###
+        if snapshot is None:
+            snapshot = self._group.read(['Position'])
 
-        current_position = self._real_motors_to_vm()
-        deltas = []
-        for motor, coupling, _ in self._motors:
-            deltas.append(motor.Position + (new_position-current_position)*coupling)
-
-        return deltas
+        return self._kinematics.inverse(new_position, snapshot['Position'], axis)
 
     # --------------------------------------------------------
-    # _get_limit_max
+    # axes_to_real_motors
     # --------------------------------------------------------
 
-    def _get_limit_max(self):
+    def _axes_to_real_motors(self, new_positions, snapshot=None):
         ###
-        # this function returns the max limits of slits according to the current mode
+        # this function returns the positions of real motors for the new positions of all VM axes
         ###
-        delta_mot_max = 1e8
-
-        for proxy, coupling, _ in self._motors:
-            if coupling >= 0:
-                unitmax = proxy.UnitLimitMax
-            else:
-                unitmax = proxy.UnitLimitMin
+        if snapshot is None:
+            snapshot = self._group.read(['Position'])
 
-            delta = unitmax - proxy.Position
-            if coupling != 0:
-                delta_mot_max = min(delta_mot_max, delta/coupling)
-
-        return self._real_motors_to_vm() + delta_mot_max
+        return self._kinematics.inverse_axes(new_positions, snapshot['Position'])
 
     # --------------------------------------------------------
-    # _get_limit_max
+    # _get_limits
     # --------------------------------------------------------
 
-    def _get_limit_min(self):
+    def _get_limits(self, snapshot=None, axis=0):
         ###
-        # this function returns the max limits of slits according to the current mode
+        # this function returns (min, max) limits of VM axis, both from one snapshot:
+        # the nearest lower and upper limits of coupled motors
         ###
-        delta_mot_min = 1e8
+        if snapshot is None:
+            snapshot = self._group.read(LIMITS_SNAPSHOT)
 
-        for proxy, coupling, _ in self._motors:
-            if coupling >= 0:
-                unitmax = proxy.UnitLimitMin
-            else:
-                unitmax = proxy.UnitLimitMax
+        inputs = np.concatenate([snapshot[name] for name in LIMITS_SNAPSHOT])
 
-            delta = unitmax - proxy.Position
-            if coupling != 0:
-                delta_mot_min = min(delta_mot_min, delta / coupling)
+        cached = self._limits_cache.get(axis)
+        if cached is not None and np.array_equal(cached[0], inputs):
+            return cached[1]
 
-        return self._real_motors_to_vm() + delta_mot_min
+        limits = tuple(float(limit) for limit in self._kinematics.limits(snapshot['Position'], snapshot['UnitLimitMin'],
+                                                                         snapshot['UnitLimitMax'], axis))
+        self._limits_cache[axis] = (inputs, limits)
+
+        return limits
 
 class CombinedMotorClass(PyTango.DeviceClass):
 
@@ -640,6 +1458,31 @@ class CombinedMotorClass(PyTango.DeviceClass):
             [PyTango.DevVarStringArray,
              "Array of strings: AttributeName, type, rd",
              [None]],
+        'TrajectoryChunk':
+            [PyTango.DevLong,
+             "Number of points of the streamed trajectory, sent to sub-motors at once. "
+             "Plain sub-motors (movevvc) stop at the end of each chunk",
+             [100]],
+        'CacheMaxAge':
+            [PyTango.DevDouble,
+             "Max age (s) of sub-motors Position/State, received by events, before they are read directly (0 - no limit)",
+             [0]],
+        'EventAbsChange':
+            [PyTango.DevDouble,
+             "Absolute change of Position, needed to push an event (0 - not used)",
+             [0]],
+        'EventRelChange':
+            [PyTango.DevDouble,
+             "Relative change (%) of Position, needed to push an event (0 - not used)",
+             [0]],
+        'PollPeriodMoving':
+            [PyTango.DevDouble,
+             "Period (s) of background polling of sub-motors, while one of them is moving",
+             [0.1]],
+        'PollPeriodIdle':
+            [PyTango.DevDouble,
+             "Period (s) of background polling of sub-motors, while no one is moving (0 - no polling)",
+             [0]],
     }
 
     #    Command definitions
@@ -653,6 +1496,27 @@ class CombinedMotorClass(PyTango.DeviceClass):
         'movevvc':
             [[PyTango.DevVarStringArray, "none"],
              [PyTango.DevVoid, "none"]],
+        'SimulateTrajectory':
+            [[PyTango.DevVarDoubleArray, "VM positions"],
+             [PyTango.DevVarDoubleArray, "[motor1, ..., motorN, out of limits] for each point"]],
+        'SetMotionProfile':
+            [[PyTango.DevVarDoubleStringArray, "[[values], [names of speed parameters]]"],
+             [PyTango.DevVoid, "none"]],
+        'MoveAxes':
+            [[PyTango.DevVarDoubleArray, "New positions of all axes"],
+             [PyTango.DevVoid, "none"]],
+        'MovevvcArray':
+            [[PyTango.DevVarDoubleArray, "[slew1, position1, slew2, position2, ...]"],
+             [PyTango.DevVoid, "none"]],
+        'AppendTrajectory':
+            [[PyTango.DevVarDoubleArray, "[slew1, position1, slew2, position2, ...]"],
+             [PyTango.DevVoid, "none"]],
+        'MoveTo':
+            [[PyTango.DevDouble, "New position"],
+             [PyTango.DevVoid, "none"]],
+        'StepScan':
+            [[PyTango.DevVarDoubleArray, "[position1, dwell1, position2, dwell2, ...], dwell in s"],
+             [PyTango.DevVoid, "none"]],
     }
 
     #    Attribute definitions
@@ -677,6 +1541,48 @@ class CombinedMotorClass(PyTango.DeviceClass):
             [[PyTango.DevDouble,
               PyTango.SCALAR,
               PyTango.READ]],
+        'Limits':
+            [[PyTango.DevDouble,
+              PyTango.SPECTRUM,
+              PyTango.READ, 2],
+             {'description': "[UnitLimitMin, UnitLimitMax] of Position"}],
+        'StartSkew':
+            [[PyTango.DevDouble,
+              PyTango.SCALAR,
+              PyTango.READ],
+             {'unit': 'ms',
+              'description': "Time between dispatch of the Position write to the first and the last "
+                             "sub-motor in the last move, measured on the client side"}],
+        'CoordinatedMove':
+            [[PyTango.DevBoolean,
+              PyTango.SCALAR,
+              PyTango.READ_WRITE],
+             {'Memorized': "true",
+              'description': "If True, speeds of sub-motors are scaled during move, so they arrive together"}],
+        'TrajectoryBuffer':
+            [[PyTango.DevLong,
+              PyTango.SCALAR,
+              PyTango.READ],
+             {'description': "Number of points of the streamed trajectory, which are not yet done (not yet "
+                             "forwarded for sub-motors with AppendTrajectory). Plain sub-motors get a chunk only "
+                             "after the previous one is done, so their motion stops between chunks"}],
+        'MoveResult':
+            [[PyTango.DevString,
+              PyTango.SCALAR,
+              PyTango.READ],
+             {'description': "'position: X, error: Y' of the last MoveTo, empty while moving; "
+                             "user event is pushed at the end of move"}],
+        'ScanPoint':
+            [[PyTango.DevDouble,
+              PyTango.SPECTRUM,
+              PyTango.READ, 2],
+             {'description': "[index, position] of the last point of step scan, reached by VM; "
+                             "user event is pushed for each point"}],
+        'AxesPosition':
+            [[PyTango.DevDouble,
+              PyTango.SPECTRUM,
+              PyTango.READ, 16],
+             {'description': "Positions of all axes, calculated from one read of sub-motors"}],
         'PositionSim':
             [[PyTango.DevDouble,
               PyTango.SCALAR,
@@ -0,0 +1,717 @@
+#!/usr/bin/env python
+# -*- coding:utf-8 -*-
+
+
+##############################################################################
+## license :
+##============================================================================
+##
+## File :        MotorGroup.py
+##
+## Project :     TANGO Device Server
+##
+## This file is part of Tango device class.
+##
+## Tango is free software: you can redistribute it and/or modify
+## it under the terms of the GNU General Public License as published by
+## the Free Software Foundation, either version 3 of the License, or
+## (at your option) any later version.
+##
+## Tango is distributed in the hope that it will be useful,
+## but WITHOUT ANY WARRANTY; without even the implied warranty of
+## MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+## GNU General Public License for more details.
+##
+## You should have received a copy of the GNU General Public License
+## along with Tango.  If not, see <http://www.gnu.org/licenses/>.
+##
+##
+## $Author :      yury.matveev@desy.de
+##
+## $Revision :    $
+##
+## $Date :        $
+##
+## $HeadUrl :     $
+##============================================================================
+
+"""
+Batched access to the physical motors of a virtual motor (SlitExecutor, CombinedMotor)
+
+All attributes needed for one request are read from all motors in one go: the read requests
+are sent asynchronously to every motor and only then the replies are collected, so one
+snapshot costs one network round trip instead of (number of motors) * (number of attributes).
+
+A snapshot is a dict {attribute name: numpy array with one value per motor}
+
+Attributes, for which the motors send change events (see subscribe), are kept in a cache
+and served from it without any network call. If the cache entry is older than max_age
+(0 - no limit) or the event channel reported an error, the attribute is read directly.
+Listeners (see add_listener) are notified about every received event.
+
+Settings, which almost never change (speed parameters, Conversion - see keep), are cached
+after a direct read even if the motor does not send events for them; they are invalidated
+by change events (if any) and by writes of the group. Keeps are counted per shared motor and
+released by the group, which made them.
+
+Motors, which do not send events, can be polled in background (see start_polling): attributes,
+which are not sent by events, are read from all motors in one batched read per cycle, fast while
+a motor is MOVING and slow otherwise; the values go to the same cache, till polling is stopped,
+and listeners are notified about changes.
+
+Writes and commands are dispatched to all motors asynchronously as well, so all motors start
+(almost) at the same time. For writes of Position the time between dispatch of the first and
+the last request is kept in start_skew: it is the spread on the client side only, the real start
+of motors can differ by the time they need to process the request.
+
+Motors are taken from the pool, shared by all devices of the server: N virtual motors over
+the same physical motor use one proxy, one event subscription and one cache of it. An attribute,
+for which the motor does not send events, is tried to be subscribed once per process.
+
+Motors of a group are connected in parallel. A motor, which cannot be reached, does not stop
+the device: it is connected (and subscribed) at the first access, till then every request,
+which needs it, fails.
+"""
+
+__all__ = ["MotorGroup", "Motor", "get_motor", "release_motor"]
+
+__docformat__ = 'restructuredtext'
+
+import PyTango
+import threading
+import time
+import numpy as np
+
+# attributes of motors, which change when a motion is started: their cached values are dropped
+# by Position writes and commands
+MOTION_ATTRIBUTES = ['State', 'CwLimit', 'CCwLimit']
+
+# time (s) after a Position write or command, during which the poller uses the moving period,
+# also if motors do not report MOVING yet
+MOTION_START_TIME = 1.
+
+# pool of motors, shared by all devices of the server: {lower case name: Motor}
+_POOL = {}
+_POOL_LOCK = threading.Lock()
+
+# attributes, for which motors do not send events: {lower case name: set of attributes},
+# each attribute of a motor is tried to be subscribed once per process
+_NO_EVENTS = {}
+
+
+# -----------------------------------------------------------------------------
+def get_motor(name):
+    """ Returns motor from the pool, the motor is created at the first request
+
+    :param name: tango address of motor
+    :return: Motor """
+
+    with _POOL_LOCK:
+        if name.lower() not in _POOL:
+            _POOL[name.lower()] = Motor(name)
+
+        motor = _POOL[name.lower()]
+        motor.users += 1
+
+        return motor
+
+
+# -----------------------------------------------------------------------------
+def release_motor(motor):
+    """ Releases motor, taken by get_motor. The last user removes it from the pool and unsubscribes events
+
+    :param motor: Motor """
+
+    with _POOL_LOCK:
+        motor.users -= 1
+        if motor.users > 0:
+            return
+
+        _POOL.pop(motor.name.lower(), None)
+
+    motor.unsubscribe()
+
+
+class Motor(object):
+    """ Physical motor: proxy, event subscriptions and cache of received values """
+
+    def __init__(self, name):
+        self.name = name
+
+        # number of groups, which use the motor
+        self.users = 0
+
+        # proxy and (lower case) command list, set by connect
+        self._proxy = None
+        self._commands = []
+        self._connect_lock = threading.Lock()
+
+        self._lock = threading.Lock()
+        self._cache = {}                    # {attribute: (value, time)}
+        self._listeners = []
+
+        # subscription calls the callback with the current value, so it cannot be done under self._lock
+        self._subscription_lock = threading.Lock()
+        self._event_ids = {}                # {attribute: event id}
+        self._subscriptions = set()         # attributes to be subscribed, also after (lazy) connection
+        self._no_events = _NO_EVENTS.setdefault(name.lower(), set())
+        self._kept = {}                     # {attribute: number of keeps}, cached after direct read
+                                            # also without events
+
+    # -----------------------------------------------------------------------------
+    @property
+    def connected(self):
+        return self._proxy is not None
+
+    # -----------------------------------------------------------------------------
+    @property
+    def proxy(self):
+        """ DeviceProxy of motor, the motor is connected if it was not reachable before """
+
+        if not self.connect():
+            PyTango.Except.throw_exception("vm", 'Cannot find {} motor'.format(self.name), "MotorGroup")
+
+        return self._proxy
+
+    # -----------------------------------------------------------------------------
+    def connect(self):
+        """ Creates proxy, if it is not done yet, and subscribes requested events
+
+        :return: True if motor is reachable """
+
+        with self._connect_lock:
+            if self._proxy is not None:
+                return True
+
+            try:
+                proxy = PyTango.DeviceProxy(self.name)
+                # the first call to the device itself: the proxy can be created for a stopped device
+                self._commands = [command.lower() for command in proxy.get_command_list()]
+            except PyTango.DevFailed:
+                return False
+
+            self._proxy = proxy
+
+        self._subscribe_all()
+
+        return True
+
+    # -----------------------------------------------------------------------------
+    def has_command(self, name):
+
+        return name.lower() in self._commands
+
+    # -----------------------------------------------------------------------------
+    def subscribe(self, attributes):
+        """ Subscribes to change events of attributes, if it is not yet done. If the motor does not
+        send events for an attribute, it is not tried again and the attribute is always read directly
+
+        :param attributes: list of attribute names """
+
+        with self._subscription_lock:
+            self._subscriptions.update(attributes)
+
+        if self.connected:
+            self._subscribe_all()
+
+    # -----------------------------------------------------------------------------
+    def keep(self, attribute):
+        """ Caches directly read values of attribute, which almost never changes, till it is invalidated.
+        Motor can be shared, so each keep must be undone by release_kept """
+
+        with self._lock:
+            self._kept[attribute] = self._kept.get(attribute, 0) + 1
+
+        self.subscribe([attribute])
+
+    # -----------------------------------------------------------------------------
+    def release_kept(self, attribute):
+        """ Undoes one keep of attribute, the last one drops the cached value, if it is not updated by events """
+
+        with self._lock:
+            count = self._kept.pop(attribute, 0) - 1
+            if count > 0:
+                self._kept[attribute] = count
+            elif attribute not in self._event_ids:
+                self._cache.pop(attribute, None)
+
+    # -----------------------------------------------------------------------------
+    def has_events(self, attribute):
+        """ :return: True if the motor sends change events of attribute """
+
+        return attribute in self._event_ids
+
+    # -----------------------------------------------------------------------------
+    def _subscribe_all(self):
+
+        with self._subscription_lock:
+            for attribute in self._subscriptions:
+                if attribute in self._event_ids or attribute in self._no_events:
+                    continue
+
+                try:
+                    self._event_ids[attribute] = self._proxy.subscribe_event(attribute,
+                                                                             PyTango.EventType.CHANGE_EVENT,
+                                                                             self._make_callback(attribute), [], False)
+                except PyTango.DevFailed:
+                    self._no_events.add(attribute)
+
+    # -----------------------------------------------------------------------------
+    def unsubscribe(self):
+
+        with self._subscription_lock:
+            for event_id in self._event_ids.values():
+                try:
+                    self._proxy.unsubscribe_event(event_id)
+                except PyTango.DevFailed:
+                    pass
+            self._event_ids = {}
+            self._subscriptions = set()
+
+        with self._lock:
+            self._cache = {}
+            self._kept = {}
+
+    # -----------------------------------------------------------------------------
+    def add_listener(self, callback):
+        """ callback(attribute) is called after a new event is put to cache """
+
+        with self._lock:
+            self._listeners.append(callback)
+
+    # -----------------------------------------------------------------------------
+    def remove_listener(self, callback):
+
+        with self._lock:
+            if callback in self._listeners:
+                self._listeners.remove(callback)
+
+    # -----------------------------------------------------------------------------
+    def get_cached(self, attributes, max_age):
+        """ :return: {attribute: value} for attributes, which are in cache and not older than max_age """
+
+        values = {}
+        now = time.time()
+        with self._lock:
+            for attribute in attributes:
+                if attribute in self._cache:
+                    value, timestamp = self._cache[attribute]
+                    if max_age <= 0 or now - timestamp <= max_age:
+                        values[attribute] = value
+
+        return values
+
+    # -----------------------------------------------------------------------------
+    def put_cached(self, attribute, value):
+        """ Puts directly read value to cache, if the attribute is updated by events or kept """
+
+        with self._lock:
+            if attribute in self._event_ids or attribute in self._kept:
+                self._cache[attribute] = (value, time.time())
+
+    # -----------------------------------------------------------------------------
+    def invalidate(self, attribute):
+
+        with self._lock:
+            self._cache.pop(attribute, None)
+
+    # -----------------------------------------------------------------------------
+    def notify(self, attribute):
+        """ Calls listeners as if an event of attribute was received """
+
+        with self._lock:
+            listeners = list(self._listeners)
+
+        for listener in listeners:
+            listener(attribute)
+
+    # -----------------------------------------------------------------------------
+    def _make_callback(self, attribute):
+
+        def callback(event):
+            self._on_event(attribute, event)
+
+        return callback
+
+    # -----------------------------------------------------------------------------
+    def _on_event(self, attribute, event):
+
+        with self._lock:
+            if event.err or event.attr_value is None:
+                self._cache.pop(attribute, None)
+            else:
+                self._cache[attribute] = (event.attr_value.value, time.time())
+
+        self.notify(attribute)
+
+
+class MotorGroup(object):
+
+    def __init__(self, names):
+        self.names = list(names)
+
+        self._motors = [get_motor(name) for name in self.names]
+
+        # max age of cached values in seconds, 0 - cache is updated by events only
+        self.max_age = 0
+
+        # time (s) between dispatch of the first and the last request of the last Position write
+        self.start_skew = 0.
+
+        self._listeners = []
+        self._motor_listeners = []          # [(motor, callback)], registered by this group
+        self._kept = []                     # attributes, kept by this group, released by close
+
+        self._poll_thread = None
+        self._polled = []
+        self._poll_stop = threading.Event()
+        self._poll_wake = threading.Event()     # set by motion start and stop_polling
+        self._poll_fast_until = 0.
+
+    # -----------------------------------------------------------------------------
+    def __len__(self):
+        return len(self._motors)
+
+    # -----------------------------------------------------------------------------
+    @property
+    def proxies(self):
+        """ list of DeviceProxy, one per motor; fails if one of motors is not reachable """
+
+        return [motor.proxy for motor in self._motors]
+
+    # -----------------------------------------------------------------------------
+    def connect(self, attributes=()):
+        """ Connects all not yet connected motors and subscribes to change events of attributes, in parallel,
+        one thread per motor. Unreachable motors are subscribed at connection
+
+        :param attributes: list of attribute names, all attributes, which the group will subscribe or keep
+        :return: list of names of motors, which are not reachable """
+
+        attributes = list(attributes)
+        threads = [threading.Thread(target=self._connect_motor, args=(motor, attributes)) for motor in self._motors]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        return [motor.name for motor in self._motors if not motor.connected]
+
+    # -----------------------------------------------------------------------------
+    @staticmethod
+    def _connect_motor(motor, attributes):
+
+        motor.subscribe(attributes)
+        motor.connect()
+
+    # -----------------------------------------------------------------------------
+    def subscribe(self, attributes):
+        """ Subscribes to change events of attributes of all motors. Motors, shared with other groups,
+        are subscribed only once
+
+        :param attributes: list of attribute names """
+
+        for index, motor in enumerate(self._motors):
+            callback = self._make_callback(index)
+            motor.add_listener(callback)
+            self._motor_listeners.append((motor, callback))
+
+            motor.subscribe(attributes)
+
+    # -----------------------------------------------------------------------------
+    def keep(self, attributes):
+        """ Caches settings of all motors, which almost never change, see Motor.keep
+
+        :param attributes: list of attribute names """
+
+        for attribute in attributes:
+            self._kept.append(attribute)
+            for motor in self._motors:
+                motor.keep(attribute)
+
+    # -----------------------------------------------------------------------------
+    def release_kept(self, attributes):
+        """ Undoes keep of attributes by this group, see Motor.release_kept
+
+        :param attributes: list of attribute names """
+
+        for attribute in attributes:
+            if attribute not in self._kept:
+                continue
+
+            self._kept.remove(attribute)
+            for motor in self._motors:
+                motor.release_kept(attribute)
+
+    # -----------------------------------------------------------------------------
+    def add_listener(self, callback):
+        """ callback(index, attribute) is called after a new event of motor[index] is put to cache """
+
+        self._listeners.append(callback)
+
+    # -----------------------------------------------------------------------------
+    def close(self):
+        """ Stops polling, removes listeners and releases motors of the group """
+
+        self.stop_polling()
+        self.release_kept(list(self._kept))
+
+        for motor, callback in self._motor_listeners:
+            motor.remove_listener(callback)
+
+        for motor in self._motors:
+            release_motor(motor)
+
+        self._motor_listeners = []
+        self._listeners = []
+        self._motors = []
+
+    # -----------------------------------------------------------------------------
+    def start_polling(self, attributes, period_moving, period_idle):
+        """ Starts background polling of motors: attributes of all motors are read in one batched read
+        per cycle and put to cache, listeners are notified about changed values
+
+        :param attributes: list of attribute names, if State is among them, the period adapts to it;
+                           attributes, which a motor sends by events, are not read from it
+        :param period_moving: period (s) while one of motors is MOVING
+        :param period_idle: period (s) while no motor is moving """
+
+        self.stop_polling()
+
+        # polled values are cached also for motors, which do not send events, till polling is stopped
+        self._polled = list(attributes)
+        self.keep(self._polled)
+
+        self._poll_stop.clear()
+        self._poll_wake.clear()
+        self._poll_thread = threading.Thread(target=self._poll, args=(self._polled, period_moving, period_idle))
+        self._poll_thread.daemon = True
+        self._poll_thread.start()
+
+    # -----------------------------------------------------------------------------
+    def stop_polling(self):
+
+        self._poll_stop.set()
+        self._poll_wake.set()
+        if self._poll_thread is not None and self._poll_thread is not threading.current_thread():
+            self._poll_thread.join()
+        self._poll_thread = None
+
+        self.release_kept(self._polled)
+        self._polled = []
+
+    # -----------------------------------------------------------------------------
+    def _poll(self, attributes, period_moving, period_idle):
+
+        while not self._poll_stop.is_set():
+            moving = False
+            try:
+                previous = [motor.get_cached(attributes, 0) for motor in self._motors]
+
+                # attributes, which motor sends by events, are taken from cache, the rest is read directly
+                for motor in self._motors:
+                    for attribute in attributes:
+                        if not motor.has_events(attribute):
+                            motor.invalidate(attribute)
+                snapshot = self.read(attributes)
+
+                for index, (motor, values) in enumerate(zip(self._motors, previous)):
+                    for attribute in attributes:
+                        if attribute not in values or np.any(values[attribute] != snapshot[attribute][index]):
+                            motor.notify(attribute)
+
+                if 'State' in snapshot:
+                    moving = np.any(snapshot['State'] == PyTango.DevState.MOVING)
+            except PyTango.DevFailed:
+                pass
+
+            fast = moving or time.time() < self._poll_fast_until
+            self._poll_wake.wait(period_moving if fast else period_idle)
+            self._poll_wake.clear()
+
+    # -----------------------------------------------------------------------------
+    def _make_callback(self, index):
+
+        def callback(attribute):
+            for listener in self._listeners:
+                listener(index, attribute)
+
+        return callback
+
+    # -----------------------------------------------------------------------------
+    def read(self, attributes, use_cache=True):
+        """ Reads attributes of all motors in parallel
+
+        :param attributes: list of attribute names
+        :param use_cache: if False, all attributes are read directly from motors
+        :return: snapshot {attribute: np.array of values, one per motor} """
+
+        attributes = list(attributes)
+
+        if use_cache:
+            values = [motor.get_cached(attributes, self.max_age) for motor in self._motors]
+        else:
+            values = [{} for _ in self._motors]
+
+        # all missing values are requested at once and only then replies are collected
+        requests = []
+        for motor, motor_values in zip(self._motors, values):
+            missing = [attribute for attribute in attributes if attribute not in motor_values]
+            if missing:
+                requests.append((missing, motor.proxy.read_attributes_asynch(missing)))
+            else:
+                requests.append((missing, None))
+
+        for motor, motor_values, (missing, request) in zip(self._motors, values, requests):
+            if request is None:
+                continue
+            for attribute, reply in zip(missing, motor.proxy.read_attributes_reply(request, 0)):
+                if reply.has_failed:
+                    PyTango.Except.throw_exception("MotorGroup",
+                                                   'Cannot read {} of {}'.format(attribute, motor.name),
+                                                   "MotorGroup")
+                motor_values[attribute] = reply.value
+                motor.put_cached(attribute, reply.value)
+
+        return dict((attribute, np.array([motor_values[attribute] for motor_values in values]))
+                    for attribute in attributes)
+
+    # -----------------------------------------------------------------------------
+    def write(self, attribute, values, indices=None):
+        """ Writes attribute of all motors in parallel, for Position the dispatch spread is kept in start_skew
+
+        :param attribute: attribute name
+        :param values: list of values, one per motor
+        :param indices: indices of motors to be written, None - all motors """
+
+        if indices is None:
+            indices = range(len(self._motors))
+
+        try:
+            self._execute('write {}'.format(attribute),
+                          lambda proxy, value: proxy.write_attribute_asynch(attribute, value),
+                          lambda proxy, request: proxy.write_attribute_reply(request, 0),
+                          values, indices, attribute == 'Position')
+        finally:
+            # motor can round the written value, so it is read again at next request
+            for index in indices:
+                self._motors[index].invalidate(attribute)
+
+            if attribute == 'Position':
+                self._motion_started(indices)
+
+    # -----------------------------------------------------------------------------
+    def write_attributes(self, values, indices=None):
+        """ Writes several attributes of all motors in parallel, one request per motor
+
+        :param values: {attribute name: list of values, one per motor}
+        :param indices: indices of motors to be written, None - all motors """
+
+        if indices is None:
+            indices = range(len(self._motors))
+
+        # each request is [(attribute, value), ...] of one motor
+        names = list(values.keys())
+        requests = [[(name, values[name][position]) for name in names] for position in range(len(indices))]
+
+        try:
+            self._execute('write {}'.format(', '.join(names)),
+                          lambda proxy, request: proxy.write_attributes_asynch(request),
+                          lambda proxy, request: proxy.write_attributes_reply(request, 0),
+                          requests, indices)
+        finally:
+            for index in indices:
+                for name in names:
+                    self._motors[index].invalidate(name)
+
+    # -----------------------------------------------------------------------------
+    def has_command(self, name):
+        """ :return: list of bools, one per motor, True if motor has command name """
+
+        return [motor.has_command(name) for motor in self._motors]
+
+    # -----------------------------------------------------------------------------
+    def command(self, name, arguments=None, indices=None):
+        """ Executes command on all motors in parallel
+
+        :param name: command name, or list of command names, one per motor
+        :param arguments: list of arguments, one per motor, None - command without argument
+        :param indices: indices of motors to execute command, None - all motors
+        :return: list of replies, one per motor """
+
+        if indices is None:
+            indices = range(len(self._motors))
+
+        if isinstance(name, str):
+            names = [name]*len(indices)
+        else:
+            names = list(name)
+            name = ', '.join(sorted(set(names)))
+
+        # each request is (command name, argument)
+        if arguments is None:
+            send = lambda proxy, request: proxy.command_inout_asynch(request[0])
+            arguments = [None]*len(indices)
+        else:
+            send = lambda proxy, request: proxy.command_inout_asynch(*request)
+
+        try:
+            return self._execute('execute {}'.format(name), send,
+                                 lambda proxy, request: proxy.command_inout_reply(request, 0),
+                                 list(zip(names, arguments)), indices)
+        finally:
+            self._motion_started(indices)
+
+    # -----------------------------------------------------------------------------
+    def _motion_started(self, indices):
+        # cached State and limit flags are outdated till the next event or poll, so they are read directly,
+        # the poller is woken up and uses the moving period for MOTION_START_TIME
+
+        for index in indices:
+            for attribute in MOTION_ATTRIBUTES:
+                self._motors[index].invalidate(attribute)
+
+        self._poll_fast_until = time.time() + MOTION_START_TIME
+        self._poll_wake.set()
+
+    # -----------------------------------------------------------------------------
+    def _execute(self, action, send, receive, arguments, indices=None, measure_skew=False):
+        # all requests are sent before any reply is awaited,
+        # errors of all motors are collected and reported together
+
+        if indices is None:
+            indices = range(len(self._motors))
+
+        names = [self.names[index] for index in indices]
+        proxies = [self._motors[index].proxy for index in indices]
+
+        errors = []
+        requests = []
+        sent = []
+        for name, proxy, argument in zip(names, proxies, arguments):
+            try:
+                requests.append(send(proxy, argument))
+                sent.append(time.time())
+            except PyTango.DevFailed as err:
+                requests.append(None)
+                errors.append('{}: {}'.format(name, err.args[0].desc))
+
+        if measure_skew and sent:
+            self.start_skew = sent[-1] - sent[0]
+
+        replies = []
+        for name, proxy, request in zip(names, proxies, requests):
+            if request is None:
+                replies.append(None)
+                continue
+            try:
+                replies.append(receive(proxy, request))
+            except PyTango.DevFailed as err:
+                replies.append(None)
+                errors.append('{}: {}'.format(name, err.args[0].desc))
+
+        if errors:
+            PyTango.Except.throw_exception("MotorGroup",
+                                           'Cannot {}: {}'.format(action, '; '.join(errors)),
+                                           "MotorGroup")
+
+        return replies
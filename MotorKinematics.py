@@ -0,0 +1,281 @@
+#!/usr/bin/env python
+# -*- coding:utf-8 -*-
+
+
+##############################################################################
+## license :
+##============================================================================
+##
+## File :        MotorKinematics.py
+##
+## Project :     TANGO Device Server
+##
+## This file is part of Tango device class.
+##
+## Tango is free software: you can redistribute it and/or modify
+## it under the terms of the GNU General Public License as published by
+## the Free Software Foundation, either version 3 of the License, or
+## (at your option) any later version.
+##
+## Tango is distributed in the hope that it will be useful,
+## but WITHOUT ANY WARRANTY; without even the implied warranty of
+## MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+## GNU General Public License for more details.
+##
+## You should have received a copy of the GNU General Public License
+## along with Tango.  If not, see <http://www.gnu.org/licenses/>.
+##
+##
+## $Author :      yury.matveev@desy.de
+##
+## $Revision :    $
+##
+## $Date :        $
+##
+## $HeadUrl :     $
+##============================================================================
+
+
+"""
+Kinematics of virtual motors (SlitExecutor, CombinedMotor): conversion between positions of
+physical motors and positions of VM axes, and limits of VM axes
+
+Linear kinematics is described by two matrices:
+    axes positions = position_matrix x motors positions
+    shift of motors = coupling_matrix x shift of axes
+which must obey position_matrix x coupling_matrix = 1. All coefficients, needed by the
+transforms and limits, are prepared in the constructor, so the functions do only the math.
+
+Nonlinear kinematics (tilt tables, Bragg geometries, ...) is given by vectorized functions
+forward, inverse and optionally jacobian; speed scaling then uses the coupling, linearized at
+the current position, and limits are searched with inverse, starting from the linearized estimate.
+
+All functions are vectorized: the new positions can be a scalar or an array of points, then
+the motors positions are returned as an array [motor, point].
+"""
+
+__all__ = ["LinearKinematics", "NonlinearKinematics", "SLIT", "SLIT_GAP", "SLIT_CENTER"]
+
+__docformat__ = 'restructuredtext'
+
+import numpy as np
+
+# search of nonlinear limits: number of points, checked in one call of inverse,
+# and max number of doublings of the search range
+LIMIT_SEARCH_POINTS = 16
+LIMIT_SEARCH_EXPANSIONS = 64
+
+
+# -----------------------------------------------------------------------------
+def _axis_limits(position, positions, limits_min, limits_max, coupled, coupling):
+    # limits of axis: the nearest limits of coupled motors, which are reached when the axis moves down and up,
+    # motors move with the axis as positions + coupling * shift of axis
+
+    positive = coupling > 0
+    distances_down = (np.where(positive, limits_min[coupled], limits_max[coupled]) - positions[coupled])/coupling
+    distances_up = (np.where(positive, limits_max[coupled], limits_min[coupled]) - positions[coupled])/coupling
+
+    return position + np.max(distances_down), position + np.min(distances_up)
+
+
+class LinearKinematics(object):
+
+    def __init__(self, position_matrix, coupling_matrix=None):
+        """
+        :param position_matrix: [axis][motor] coefficients of axes positions
+        :param coupling_matrix: [motor][axis] coefficients of motors shifts, None - pseudo inverse of position_matrix
+        :raises ValueError: if matrices do not obey position_matrix x coupling_matrix = 1
+        """
+
+        self.position_matrix = np.array(position_matrix, dtype=float, ndmin=2)
+        if coupling_matrix is None:
+            self.coupling_matrix = np.linalg.pinv(self.position_matrix)
+        else:
+            self.coupling_matrix = np.array(coupling_matrix, dtype=float, ndmin=2)
+
+        if self.coupling_matrix.shape != self.position_matrix.T.shape or \
+                not np.allclose(np.dot(self.position_matrix, self.coupling_matrix), np.eye(len(self.position_matrix))):
+            raise ValueError('Coefficients do not obey sum(coupling*position) = 1')
+
+        # for limits: per axis - motors, which move with the axis, and their coupling
+        self._coupled = []
+        self._coupling = []
+        for coupling in self.coupling_matrix.T:
+            coupled = np.flatnonzero(coupling)
+            self._coupled.append(coupled)
+            self._coupling.append(coupling[coupled])
+
+    # -----------------------------------------------------------------------------
+    def __len__(self):
+        return len(self.position_matrix)
+
+    # -----------------------------------------------------------------------------
+    def local(self, positions):
+        """ :return: (position_matrix, coupling_matrix), the same at any position """
+
+        return self.position_matrix, self.coupling_matrix
+
+    # -----------------------------------------------------------------------------
+    def forward(self, positions, axis=None):
+        """ :return: position of axis, or positions of all axes if axis is None """
+
+        if axis is None:
+            return np.dot(self.position_matrix, positions)
+
+        return np.dot(self.position_matrix[axis], positions)
+
+    # -----------------------------------------------------------------------------
+    def inverse(self, new_position, positions, axis=0):
+        """ :return: motors positions, which bring axis to new_position, other axes stay """
+
+        shifts = np.multiply.outer(self.coupling_matrix[:, axis],
+                                   np.asarray(new_position) - np.dot(self.position_matrix[axis], positions))
+
+        return (positions + shifts.T).T
+
+    # -----------------------------------------------------------------------------
+    def inverse_axes(self, new_positions, positions):
+        """ :return: motors positions, which bring all axes to new_positions """
+
+        return positions + np.dot(self.coupling_matrix, np.asarray(new_positions) - np.dot(self.position_matrix, positions))
+
+    # -----------------------------------------------------------------------------
+    def limits(self, positions, limits_min, limits_max, axis=0):
+        """ :return: (min, max) positions of axis: the nearest limits of coupled motors in both directions """
+
+        return _axis_limits(self.forward(positions, axis), positions, limits_min, limits_max,
+                            self._coupled[axis], self._coupling[axis])
+
+
+class NonlinearKinematics(object):
+
+    def __init__(self, forward, inverse, jacobian=None, axes=1):
+        """
+        :param forward: function(motors positions [motor(, point)]) -> axes positions [axis(, point)]
+        :param inverse: function(axes positions [axis(, point)], current motors positions [motor])
+                        -> motors positions [motor(, point)]
+        :param jacobian: function(motors positions [motor]) -> d axes/d motors [axis][motor],
+                         None - calculated numerically from forward
+        :param axes: number of axes
+        """
+
+        self._forward = forward
+        self._inverse = inverse
+        self._jacobian = jacobian
+        self._axes = axes
+
+    # -----------------------------------------------------------------------------
+    def __len__(self):
+        return self._axes
+
+    # -----------------------------------------------------------------------------
+    def jacobian(self, positions):
+        """ :return: d axes/d motors [axis][motor] at positions """
+
+        positions = np.asarray(positions, dtype=float)
+        if self._jacobian is not None:
+            return np.array(self._jacobian(positions), dtype=float, ndmin=2)
+
+        # central differences, all shifted points are evaluated in one call
+        steps = 1e-6*np.maximum(np.abs(positions), 1.)
+        shifts = np.diag(steps)
+        values = np.reshape(self._forward(np.hstack((positions[:, None] + shifts, positions[:, None] - shifts))),
+                            (self._axes, -1))
+
+        return (values[:, :len(positions)] - values[:, len(positions):])/(2*steps)
+
+    # -----------------------------------------------------------------------------
+    def local(self, positions):
+        """ :return: (position_matrix, coupling_matrix), linearized at positions """
+
+        position_matrix = self.jacobian(positions)
+
+        return position_matrix, np.linalg.pinv(position_matrix)
+
+    # -----------------------------------------------------------------------------
+    def forward(self, positions, axis=None):
+        """ :return: position of axis, or positions of all axes if axis is None """
+
+        axes = np.reshape(self._forward(np.asarray(positions, dtype=float)), (self._axes,) + np.shape(positions)[1:])
+        if axis is None:
+            return axes
+
+        return axes[axis]
+
+    # -----------------------------------------------------------------------------
+    def inverse(self, new_position, positions, axis=0):
+        """ :return: motors positions, which bring axis to new_position, other axes stay """
+
+        new_position = np.asarray(new_position, dtype=float)
+        axes = np.multiply.outer(self.forward(positions), np.ones(new_position.shape))
+        axes[axis] = new_position
+
+        return self.inverse_axes(axes, positions)
+
+    # -----------------------------------------------------------------------------
+    def inverse_axes(self, new_positions, positions):
+        """ :return: motors positions, which bring all axes to new_positions """
+
+        return np.asarray(self._inverse(np.asarray(new_positions, dtype=float), np.asarray(positions, dtype=float)))
+
+    # -----------------------------------------------------------------------------
+    def limits(self, positions, limits_min, limits_max, axis=0):
+        """ :return: (min, max) positions of axis: the nearest positions in both directions, where one of motors,
+                     moved by inverse, reaches its limit """
+
+        positions = np.asarray(positions, dtype=float)
+        position = float(self.forward(positions, axis))
+
+        coupling = self.local(positions)[1][:, axis]
+        coupled = np.flatnonzero(np.abs(coupling) > 1e-12*np.max(np.abs(coupling)))
+        estimate = _axis_limits(position, positions, limits_min, limits_max, coupled, coupling[coupled])
+
+        def allowed(new_positions):
+            # for each point: all motors are within limits, points, where inverse fails (nan), are not allowed
+            with np.errstate(invalid='ignore', over='ignore'):
+                motors = np.reshape(self.inverse(new_positions, positions, axis), (len(positions), -1)).T
+                return np.all((motors >= limits_min) & (motors <= limits_max), axis=1)
+
+        # motors are already out of limits - nothing to search from
+        if not allowed(position)[0]:
+            return estimate
+
+        return tuple(self._search_limit(allowed, position, direction, abs(limit - position))
+                     for direction, limit in zip((-1, 1), estimate))
+
+    # -----------------------------------------------------------------------------
+    @staticmethod
+    def _search_limit(allowed, position, direction, step):
+        # the last allowed position in the direction from position: the range is doubled until the first
+        # not allowed point, then narrowed to the step between the last allowed and the first not allowed points
+
+        if not np.isfinite(step) or step == 0:
+            step = max(abs(position), 1.)
+
+        points = position + direction*step*2.**np.arange(LIMIT_SEARCH_EXPANSIONS)
+        outside = np.flatnonzero(~allowed(points))
+        if not len(outside):
+            return direction*np.inf
+
+        inside = points[outside[0] - 1] if outside[0] else position
+        outside = points[outside[0]]
+
+        while True:
+            points = np.linspace(inside, outside, LIMIT_SEARCH_POINTS + 2)[1:-1]
+            flags = allowed(points)
+            if np.all(flags):
+                new_inside, new_outside = points[-1], outside
+            else:
+                first = np.argmin(flags)
+                new_inside, new_outside = (points[first - 1] if first else inside), points[first]
+
+            if new_inside == inside and new_outside == outside:
+                return float(inside)
+
+            inside, outside = new_inside, new_outside
+
+
+# pair of slit blades: gap = first - second, center = (first + second)/2
+SLIT = LinearKinematics([[1., -1.], [0.5, 0.5]], [[0.5, 1.], [-0.5, 1.]])
+SLIT_GAP = 0
+SLIT_CENTER = 1
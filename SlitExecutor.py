@@ -51,10 +51,44 @@ ATTRIBUTES = { # Name: Scalable
               'StepBacklash': False,
               'FlagClosedLoop': False}
 
+# attributes of sub-motors, needed for kinematics and limits calculation
+LIMITS_SNAPSHOT = ['Position', 'UnitLimitMin', 'UnitLimitMax']
+
+# period (s) of State check, while waiting for the end of move
+MOVE_POLL_PERIOD = 0.1
+
+# time (s), within which sub-motors must report MOVING or reach the targets after the move start
+MOVE_START_TIMEOUT = 1.
+
+# time (s), which delete_device waits for the end of step scan and trajectory stream
+THREAD_STOP_TIMEOUT = 5.
+
+# attributes, for which the device pushes change and archive events
+PUSHED_ATTRIBUTES = ['Position', 'State', 'CwLimit', 'CcwLimit']
+
+# attributes of sub-motors, served from cache, which is fed by events and by the background poller
+MOTOR_ATTRIBUTES = ['Position', 'State', 'CwLimit', 'CCwLimit', 'UnitLimitMin', 'UnitLimitMax']
+
 import PyTango
 import sys
+import threading
+import time
 import numpy as np
 
+from collections import deque
+
+from MotorGroup import MotorGroup
+from MotorKinematics import SLIT, SLIT_GAP, SLIT_CENTER
+
+# attributes of four-blade slit: Name: (pair of motors, axis of SLIT kinematics)
+SLIT_AXES = {'HGap': (0, SLIT_GAP),
+             'HCenter': (0, SLIT_CENTER),
+             'VGap': (1, SLIT_GAP),
+             'VCenter': (1, SLIT_CENTER)}
+
+# states of sub-motors, passed to VM, in order of priority
+STATE_PRIORITY = [PyTango.DevState.FAULT, PyTango.DevState.MOVING, PyTango.DevState.ALARM]
+
 class SlitExecutor(PyTango.Device_4Impl):
 
     def __init__(self, cl, name):
@@ -65,10 +99,26 @@ class SlitExecutor(PyTango.Device_4Impl):
     # -----------------------------------------------------------------------------
     def delete_device(self):
         self.debug_stream("In delete_device()")
+        self._stop_trajectory_stream()
+        self._scan_stop.set()
+
+        # scan and stream threads use the group till they finish the current step
+        for thread in [self._scan_thread, self._stream_thread]:
+            if thread is not None:
+                thread.join(THREAD_STOP_TIMEOUT)
+                if thread.is_alive():
+                    self.warn_stream('Scan or trajectory stream is still running, sub-motors are released anyway')
+
+        self._group.close()
 
     # -----------------------------------------------------------------------------
     def init_device(self):
         self.debug_stream("In init_device()")
+
+        # duration of startup phases, logged at the end
+        timings = []
+        phase_start = time.time()
+
         self.get_device_properties(self.get_device_class())
         self._position_sim = 0.0
 
@@ -76,40 +126,184 @@ class SlitExecutor(PyTango.Device_4Impl):
         # check what is our mode
         # --------------------------------------------------------
 
+        # Position (as well as movevvc, Calibrate, etc.) is done by the first pair of motors,
+        # in four-blade mode the second pair is used by VGap and VCenter
         if str(self.Direction).lower() in ['h', 'horizontal']:
             self._motor_names = ['Left', 'Right']
+            self._pairs = [[0, 1]]
         elif str(self.Direction).lower() in ['v', 'vertical']:
             self._motor_names = ['Top', 'Bottom']
+            self._pairs = [[0, 1]]
+        elif str(self.Direction).lower() in ['b', 'both', 'hv']:
+            self._motor_names = ['Left', 'Right', 'Top', 'Bottom']
+            self._pairs = [[0, 1], [2, 3]]
         else:
             PyTango.Except.throw_exception("vm", "Unknown mode", "VmExecutor")
 
+        # Position (of the first pair) is gap or center of slit, with unknown mode only
+        # the four-blade attributes can be used
+        if str(self.Mode).lower() in ['g', 'gap']:
+            self._axis = SLIT_GAP
+        elif str(self.Mode).lower() in ['p', 'pos', 'position']:
+            self._axis = SLIT_CENTER
+        else:
+            self._axis = None
+
         # --------------------------------------------------------
         # making real motor proxies
         # --------------------------------------------------------
-        self._proxies = []
+        motors = []
         for name in self._motor_names:
             try:
-                proxy = getattr(self, name)
+                motors.append(getattr(self, name))
             except:
                 PyTango.Except.throw_exception("vm", 'Cannot find {} attribute'.format(name), "VmExecutor")
 
-            self._proxies.append(PyTango.DeviceProxy(proxy))
+        self._group = MotorGroup(motors)
 
-        self.set_state(PyTango.DevState.ON)
+        timings.append(('properties', time.time() - phase_start))
+        phase_start = time.time()
+
+        # motors are connected and subscribed in parallel, at once for all attributes, which are served from cache,
+        # the unreachable ones will be connected at the first access
+        unreachable = self._group.connect(MOTOR_ATTRIBUTES + list(ATTRIBUTES.keys()))
+        if unreachable:
+            self.warn_stream('Cannot connect {}, will retry at first access'.format(', '.join(unreachable)))
 
-        # Create a proxy to the own device for setting Position properties
-        self.dev = PyTango.DeviceProxy(self.get_name())
+        timings.append(('connection', time.time() - phase_start))
+        phase_start = time.time()
 
+        # streamed trajectory: chunks of converted trajectory, waiting to be sent to sub-motors
+        self._stream = deque()
+        self._stream_points = 0
+        self._stream_snapshot = None
+        self._stream_thread = None
+        self._stream_lock = threading.Lock()
 
-        # Checking whether sub-motors have equal settings
+        # step scan, executed by the device itself: [index, position] of the last reached point
+        self._scan_thread = None
+        self._scan_stop = threading.Event()
+        self._scan_point = [-1, np.nan]
 
-        for attribute in ATTRIBUTES.keys():
-            self._get_attribute(attribute)
+        # notified on each State event of sub-motors, _wait_move_done waits for it
+        self._state_changed = threading.Condition()
 
+        # result of the last MoveTo, pushed as user event at the end of move
+        self._move_result = ''
+
+        # Position, State and limit flags of sub-motors are served from cache, fed by change events,
+        # each event of sub-motor is converted to the event of VM
+        for name in PUSHED_ATTRIBUTES:
+            self.set_change_event(name, True, False)
+            self.set_archive_event(name, True, False)
+
+        self._events_lock = threading.Lock()
+        self._last_events = {}
+
+        self._group.max_age = self.CacheMaxAge
+        self._group.add_listener(self._on_motor_event)
+        self._group.subscribe(MOTOR_ATTRIBUTES)
+
+        # sub-motors, which do not send events, are polled in background
+        if self.PollPeriodIdle > 0:
+            self._group.start_polling(MOTOR_ATTRIBUTES, self.PollPeriodMoving, self.PollPeriodIdle)
+
+        # speed parameters are cached, the cache is filled by the settings check below
+        self._group.keep(ATTRIBUTES.keys())
+
+        timings.append(('subscription', time.time() - phase_start))
+        phase_start = time.time()
+
+        self.set_state(PyTango.DevState.ON)
+
+        # last limits, propagated to the Position attribute config
+        self._position_limits = None
+
+        # last calculated limits, valid till positions or limits of sub-motors change: {axis: (snapshot, limits)}
+        self._limits_cache = {}
+
+        # Checking whether sub-motors have equal settings. With unreachable motors the settings stay
+        # unchecked (also after the motors are connected) till EqualizeSettings is executed
+        if unreachable:
+            self.warn_stream('Settings of sub-motors are not checked, execute EqualizeSettings when all are reachable')
+        else:
+            self._equalize_attributes()
+
+        timings.append(('settings check', time.time() - phase_start))
+        self.info_stream('Startup: {}'.format(', '.join('{} {:.3f} s'.format(phase, duration)
+                                                        for phase, duration in timings)))
 
     def always_executed_hook(self):
         self.debug_stream("In always_excuted_hook()")
 
+    # -----------------------------------------------------------------------------
+    #    Events
+    # -----------------------------------------------------------------------------
+
+    def _on_motor_event(self, index, attribute):
+        # called by MotorGroup each time one of sub-motors sends an event
+
+        try:
+            if attribute == 'Position':
+                self._push_event('Position', self._real_motors_to_vm())
+            elif attribute == 'State':
+                self._push_event('State', self._get_state())
+                with self._state_changed:
+                    self._state_changed.notify_all()
+            elif attribute == 'CwLimit':
+                self._push_event('CwLimit', self._get_limit_flag('CwLimit'))
+            elif attribute == 'CCwLimit':
+                self._push_event('CcwLimit', self._get_limit_flag('CCwLimit'))
+            elif attribute in ATTRIBUTES:
+                # reports sub-motors, which settings diverge
+                self._get_attribute(attribute)
+        except PyTango.DevFailed as err:
+            self.debug_stream("Cannot push event for {}: {}".format(attribute, err))
+
+    # -----------------------------------------------------------------------------
+    def _push_event(self, name, value):
+
+        with self._events_lock:
+            last_value = self._last_events.get(name)
+            if name == 'Position':
+                changed = self._position_changed(value, last_value)
+            else:
+                changed = last_value is None or value != last_value
+
+            if not changed:
+                return
+
+            self._last_events[name] = value
+            if name == 'State':
+                self.set_state(value)
+                self.push_change_event('State')
+                self.push_archive_event('State')
+            else:
+                self.push_change_event(name, value)
+                self.push_archive_event(name, value)
+
+    # -----------------------------------------------------------------------------
+    def _position_changed(self, value, last_value):
+        # applies EventAbsChange/EventRelChange deadbands, if both are 0 - any change is pushed
+
+        if last_value is None:
+            return True
+
+        change = abs(value - last_value)
+        if change == 0:
+            return False
+
+        if self.EventAbsChange <= 0 and self.EventRelChange <= 0:
+            return True
+
+        if 0 < self.EventAbsChange <= change:
+            return True
+
+        if self.EventRelChange > 0 and last_value != 0 and 100. * change / abs(last_value) >= self.EventRelChange:
+            return True
+
+        return False
+
 
     # -----------------------------------------------------------------------------
     #    Slit related read/write attribute methods
@@ -126,10 +320,29 @@ class SlitExecutor(PyTango.Device_4Impl):
     def write_Position(self, attr):
 
         self.debug_stream("In write_Position()")
-        new_position = attr.get_write_value()
+        self._move_pair(attr.get_write_value())
+
+    # -----------------------------------------------------------------------------
+    def read_SlitAxis(self, attr):
+
+        self.debug_stream("In read_SlitAxis()")
+        pair, axis = SLIT_AXES[attr.get_name()]
+        attr.set_value(self._real_motors_to_vm(pair=pair, axis=axis))
+
+    # -----------------------------------------------------------------------------
+    def write_SlitAxis(self, attr):
+
+        self.debug_stream("In write_SlitAxis()")
+        pair, axis = SLIT_AXES[attr.get_name()]
+        self._move_pair(attr.get_write_value(), pair, axis)
+
+    # -----------------------------------------------------------------------------
+    def _move_pair(self, new_position, pair=0, axis=None):
+
+        # one batched read of all sub-motors is used for limits check and kinematics
+        snapshot = self._group.read(LIMITS_SNAPSHOT, use_cache=False)
 
-        min_value = self._get_limit_min()
-        max_value = self._get_limit_max()
+        min_value, max_value = self._get_limits(snapshot, pair, axis)
 
         if new_position < min_value or new_position > max_value:
             PyTango.Except.throw_exception("write_Position",
@@ -137,72 +350,79 @@ class SlitExecutor(PyTango.Device_4Impl):
                                                min_value) + ", max: " + str(max_value) + ")",
                                            "VmExecutor")
 
-        for motor_proxy, new_position in zip(self._proxies, self._vm_to_real_motors(new_position)):
-            motor_proxy.Position = new_position
+        new_positions = self._vm_to_real_motors(new_position, snapshot, pair, axis)
+        self._group.write('Position', new_positions, self._pairs[pair])
+
+        return new_positions
 
 
     # -----------------------------------------------------------------------------
     def read_CwLimit(self, attr):
 
         self.debug_stream("In read_CwLimit()")
-
-        no_limit = True
-        #
-        # if one of the motors is in the limit return 1
-        #
-        for proxy in self._proxies:
-            no_limit *= proxy.CwLimit == 0
-
-        attr.set_value(not no_limit)
+        attr.set_value(self._get_limit_flag('CwLimit'))
 
 
     # -----------------------------------------------------------------------------
     def read_CcwLimit(self, attr):
 
         self.debug_stream("In read_CcwLimit()")
-        no_limit = True
-        #
-        # if one of the motors is in the limit return 1
-        #
-        for proxy in self._proxies:
-            no_limit *= proxy.CCwLimit == 0
-
-        attr.set_value(not no_limit)
+        attr.set_value(self._get_limit_flag('CCwLimit'))
 
 
     # -----------------------------------------------------------------------------
     def read_UnitLimitMin(self, attr):
 
         self.debug_stream("In read_UnitLimitMin()")
-        self.attr_UnitLimitMin_read = self._get_limit_min()
+        limit_min, _ = self._update_position_limits()
+        attr.set_value(limit_min)
 
-        cfg = []
-        config = self.dev.get_attribute_config("Position")
-        config.min_value = str(self.attr_UnitLimitMin_read)
 
-        cfg.append(config)
+    # -----------------------------------------------------------------------------
+    def read_UnitLimitMax(self, attr):
 
-        self.dev.set_attribute_config(cfg)
+        self.debug_stream("In read_UnitLimitMax()")
+        _, limit_max = self._update_position_limits()
+        attr.set_value(limit_max)
 
-        attr.set_value(self.attr_UnitLimitMin_read)
+    # -----------------------------------------------------------------------------
+    def read_Limits(self, attr):
 
+        self.debug_stream("In read_Limits()")
+        attr.set_value(list(self._update_position_limits()))
 
     # -----------------------------------------------------------------------------
-    def read_UnitLimitMax(self, attr):
+    def _update_position_limits(self):
+        # calculates limits of VM and sets them as min/max value of the Position attribute,
+        # the attribute config (and the DB) is touched only if the limits have changed
 
-        self.debug_stream("In read_UnitLimitMax()")
+        snapshot = self._group.read(LIMITS_SNAPSHOT)
+        limits = self._get_limits(snapshot)
 
-        unit_limit_max = self._get_limit_max()
+        if limits != self._position_limits:
+            attribute = self.get_device_attr().get_w_attr_by_name('Position')
 
-        cfg = []
-        config = self.dev.get_attribute_config("Position")
-        config.max_value = str(unit_limit_max)
+            # a limit, which is not found (infinite), is not set
+            setters = [(attribute.set_min_value, limits[0]), (attribute.set_max_value, limits[1])]
+            try:
+                for setter, limit in setters:
+                    if np.isfinite(limit):
+                        setter(limit)
+            except PyTango.DevFailed:
+                # new min is above the old max, so the max has to be set first
+                for setter, limit in reversed(setters):
+                    if np.isfinite(limit):
+                        setter(limit)
 
-        cfg.append(config)
+            self._position_limits = limits
 
-        self.dev.set_attribute_config(cfg)
+        return limits
+
+    # -----------------------------------------------------------------------------
+    def read_StartSkew(self, attr):
 
-        attr.set_value(unit_limit_max)
+        self.debug_stream("In read_StartSkew()")
+        attr.set_value(self._group.start_skew*1e3)
 
     # -----------------------------------------------------------------------------
     def read_PositionSim(self, attr):
@@ -223,7 +443,8 @@ class SlitExecutor(PyTango.Device_4Impl):
 
         self.debug_stream("In read_ResultSim()")
         _answer = []
-        for name, position in zip(self._motor_names, self._vm_to_real_motors(self._position_sim)):
+        for index, position in zip(self._pairs[0], self._vm_to_real_motors(self._position_sim)):
+            name = self._motor_names[index]
             _answer.append("{} [{}]: {}".format(name, getattr(self, name), position))
 
         attr.set_value(_answer, len(_answer))
@@ -234,23 +455,58 @@ class SlitExecutor(PyTango.Device_4Impl):
 
     def _set_attribute(self, name, value):
 
-        if str(self.Mode).lower() in ['g', 'gap'] and ATTRIBUTES[name]:
+        self._group.write(name, self._motor_values(name, value, self._group.read([name])))
+
+    # -----------------------------------------------------------------------------
+    def _motor_values(self, name, value, snapshot):
+        # converts VM value of speed parameter to values of sub-motors, sign of each motor is taken from snapshot,
+        # flags are written as they are and integer attributes stay integer
+
+        if name == 'FlagClosedLoop':
+            return [int(value)]*len(self._group)
+
+        if self._axis == SLIT_GAP and ATTRIBUTES[name]:
             value /= 2
 
-        for proxy in self._proxies:
-            setattr(proxy, name, value * np.sign(getattr(proxy, name)))
+        values = value*np.sign(snapshot[name])
+        if np.issubdtype(np.asarray(snapshot[name]).dtype, np.integer):
+            values = np.round(values).astype(int)
+
+        return values
+
+    # -----------------------------------------------------------------------------
+    def _equalize_attributes(self):
+        # all settings of all motors are read in one go, motors of a pair which differ are set
+        # to the min value of the pair (maintaining the sign!!) in parallel; in four-blade mode
+        # the pairs are independent. Conversion is calibration, it is only reported, never changed
+
+        snapshot = self._group.read(ATTRIBUTES.keys(), use_cache=False)
+        for name, values in snapshot.items():
+            new_values = np.array(values)
+            for pair in self._pairs:
+                new_values[pair] = np.min(np.abs(values[pair]))*np.sign(values[pair])
+
+            if np.all(new_values == values):
+                continue
+
+            if name == 'Conversion':
+                self.warn_stream('Conversion differs between blades of a pair: {}, '
+                                 'it has to be set explicitly'.format(list(values)))
+                continue
+
+            self._group.write(name, new_values)
 
     # -----------------------------------------------------------------------------
     def _get_attribute(self, name):
-        # first we need to check that attribute values are the same for all motors,
-        # set it to min value (maintaining the sign!!) if not, and only then return absolute (!!) value
+        # read only: returns min absolute (!!) value of all motors, motors which differ
+        # are reported, but not changed - this is done by EqualizeSettings command
 
-        values = [getattr(proxy, name) for proxy in self._proxies]
+        values = self._group.read([name])[name]
         new_value = np.min(np.abs(values))
-        for proxy, value in zip(self._proxies, values):
-            setattr(proxy, name, new_value*np.sign(value))
+        if np.any(np.abs(values) != new_value):
+            self.warn_stream('{} differs between sub-motors: {}, use EqualizeSettings'.format(name, list(values)))
 
-        if str(self.Mode).lower() in ['g', 'gap'] and ATTRIBUTES[name]:
+        if self._axis == SLIT_GAP and ATTRIBUTES[name]:
             new_value *= 2
 
         return new_value
@@ -359,6 +615,12 @@ class SlitExecutor(PyTango.Device_4Impl):
 
     # -----------------------------------------------------------------------------
     def initialize_dynamic_attributes(self):
+        # four-blade slit gets gaps and centers of both directions
+        if len(self._pairs) == 2:
+            for name in sorted(SLIT_AXES.keys()):
+                self.add_attribute(PyTango.Attr(name, PyTango.DevDouble, PyTango.READ_WRITE),
+                                   self.read_SlitAxis, self.write_SlitAxis)
+
         for attr in self.DynamicAttributes:
             attr = attr.replace("\"", "")
             attr = attr.split(',')
@@ -418,23 +680,7 @@ class SlitExecutor(PyTango.Device_4Impl):
         :rtype: PyTango.CmdArgType.DevState """
 
         self.debug_stream("In dev_state()")
-        argout = PyTango.DevState.ON
-
-        #
-        # if one device is in FAULT the VM is in FAULT too
-        #
-        for proxy in self._proxies:
-            if proxy.state() == PyTango.DevState.FAULT:
-                argout = PyTango.DevState.FAULT
-                break
-        if argout == PyTango.DevState.ON:
-            #
-            # if one device is MOVING the VM is MOVING too
-            #
-            for proxy in self._proxies:
-                if proxy.state() == PyTango.DevState.MOVING:
-                    argout = PyTango.DevState.MOVING
-                    break
+        argout = self._get_state()
 
         self.set_state(argout)
 
@@ -442,6 +688,27 @@ class SlitExecutor(PyTango.Device_4Impl):
             PyTango.Device_4Impl.dev_state(self)
         return self.get_state()
 
+    # -----------------------------------------------------------------------------
+    def _get_state(self):
+        #
+        # the state of VM is resolved from one snapshot of sub-motors states (served from cache):
+        # if one device is in FAULT the VM is in FAULT too, then MOVING, then ALARM
+        #
+        states = list(self._group.read(['State'])['State'])
+
+        for state in STATE_PRIORITY:
+            if state in states:
+                return state
+
+        return PyTango.DevState.ON
+
+    # -----------------------------------------------------------------------------
+    def _get_limit_flag(self, name):
+        #
+        # if one of the motors is in the limit return 1
+        #
+        return int(np.any(self._group.read([name])[name] != 0))
+
     # -----------------------------------------------------------------------------
     def Calibrate(self, argin):
         """ Re-defines the current position by changing the HomePosition, UnitCalibration, etc.
@@ -453,8 +720,8 @@ class SlitExecutor(PyTango.Device_4Impl):
 
         self.debug_stream("In Calibrate()")
         try:
-            for proxy, position in zip(self._proxies, self.vm_to_real_motors(argin)):
-                proxy.Calibrate(position)
+            snapshot = self._group.read(['Position'], use_cache=False)
+            self._group.command('Calibrate', list(self._vm_to_real_motors(argin, snapshot)), self._pairs[0])
             return True
         except:
             return False
@@ -475,8 +742,110 @@ class SlitExecutor(PyTango.Device_4Impl):
         :return:
         :rtype: PyTango.DevVoid """
         self.debug_stream("In StopMove()")
-        for proxy in self._proxies:
-            proxy.StopMove()
+        self._stop_trajectory_stream()
+        self._scan_stop.set()
+        self._group.command('StopMove')
+
+    # -----------------------------------------------------------------------------
+    def EqualizeSettings(self):
+        """ Sets speed parameters of both motors of each pair to the min value of the pair (maintaining the sign),
+        Conversion is not changed, its difference is only reported
+
+        :param :
+        :type: PyTango.DevVoid
+        :return:
+        :rtype: PyTango.DevVoid """
+        self.debug_stream("In EqualizeSettings()")
+        self._equalize_attributes()
+
+    # -----------------------------------------------------------------------------
+    def SetMotionProfile(self, argin):
+        """ Sets several speed parameters at once, with one write per sub-motor
+
+        :param : argin: [[values], [names]], names from Acceleration, BaseRate, Conversion, SlewRate,
+                        SlewRateMax, SlewRateMin, StepBacklash, FlagClosedLoop
+        :type: PyTango.DevVarDoubleStringArray
+        :return:
+        :rtype: PyTango.DevVoid """
+        self.debug_stream("In SetMotionProfile()")
+
+        values, names = argin
+        if len(values) != len(names):
+            PyTango.Except.throw_exception("SetMotionProfile",
+                                           "Wrong argument, {} values for {} parameters".format(len(values), len(names)),
+                                           "SlitExecutor")
+
+        unknown = [name for name in names if name not in ATTRIBUTES]
+        if unknown:
+            PyTango.Except.throw_exception("SetMotionProfile",
+                                           "Wrong argument, unknown parameters: {}".format(', '.join(unknown)),
+                                           "SlitExecutor")
+
+        snapshot = self._group.read(names)
+        self._group.write_attributes(dict((name, self._motor_values(name, value, snapshot))
+                                          for name, value in zip(names, values)))
+
+    # -----------------------------------------------------------------------------
+    def SetSlit(self, argin):
+        """ Sets gaps and centers of both directions in one move (four-blade mode only)
+
+        :param : argin: [HGap, HCenter, VGap, VCenter]
+        :type: PyTango.DevVarDoubleArray
+        :return:
+        :rtype: PyTango.DevVoid """
+        self.debug_stream("In SetSlit()")
+
+        if len(self._pairs) != 2:
+            PyTango.Except.throw_exception("SetSlit", "SetSlit is available in four-blade mode only", "SlitExecutor")
+
+        if len(argin) != 4:
+            PyTango.Except.throw_exception("SetSlit", "[HGap, HCenter, VGap, VCenter] expected", "SlitExecutor")
+
+        snapshot = self._group.read(LIMITS_SNAPSHOT, use_cache=False)
+
+        new_positions = np.empty(len(self._motor_names))
+        for pair, axes in zip(self._pairs, np.reshape(argin, (2, 2))):
+            new_positions[pair] = SLIT.inverse_axes(axes, snapshot['Position'][pair])
+
+        out_of_limits = (new_positions < snapshot['UnitLimitMin']) | (new_positions > snapshot['UnitLimitMax'])
+        if np.any(out_of_limits):
+            PyTango.Except.throw_exception("SetSlit",
+                                           "Positions are out of limits of {}".format(
+                                               ', '.join(np.array(self._motor_names)[out_of_limits])),
+                                           "SlitExecutor")
+
+        self._group.write('Position', new_positions)
+
+    # -----------------------------------------------------------------------------
+    def is_SetSlit_allowed(self):
+        self.debug_stream("In is_SetSlit_allowed()")
+        return self.get_state() not in [PyTango.DevState.MOVING, PyTango.DevState.FAULT]
+
+    # -----------------------------------------------------------------------------
+    def SimulateTrajectory(self, argin):
+        """ Calculates positions of sub-motors for an array of VM positions, without moving
+
+        :param : argin: VM positions
+        :type: PyTango.DevVarDoubleArray
+        :return: for each point: positions of sub-motors and 1 if one of them is out of limits, otherwise 0
+        :rtype: PyTango.DevVarDoubleArray """
+        self.debug_stream("In SimulateTrajectory()")
+
+        if len(argin) == 0:
+            PyTango.Except.throw_exception("SimulateTrajectory", "At least one position expected", "SlitExecutor")
+
+        ###
+        # all points are converted at once from one snapshot, the result is flattened [point, motor + flag] array
+        ###
+        snapshot = self._group.read(LIMITS_SNAPSHOT)
+        motors_positions = np.reshape(self._vm_to_real_motors(np.asarray(argin, dtype=float), snapshot),
+                                      (-1, len(argin))).T
+
+        limits_min = snapshot['UnitLimitMin'][self._pairs[0]]
+        limits_max = snapshot['UnitLimitMax'][self._pairs[0]]
+        out_of_limits = np.any((motors_positions < limits_min) | (motors_positions > limits_max), axis=1)
+
+        return np.column_stack((motors_positions, out_of_limits)).ravel()
 
     # -----------------------------------------------------------------------------
     def movevvc(self, argin):
@@ -488,113 +857,422 @@ class SlitExecutor(PyTango.Device_4Impl):
         :rtype: PyTango.DevVoid """
         self.debug_stream("In movevvc()")
 
-        cmd_lists = [[], []]
-        for line in argin:
-            slew, pos = line.split(',')
-            slew = int(slew.split(':')[1].strip())
-            positions = self._vm_to_real_motors(float(pos.split(':')[1].strip()))
-            for cmd_list, pos in zip(cmd_lists, positions):
-                cmd_list.append('slew: {}, position: {}'.format(slew, pos))
+        self._move_trajectory(*self._parse_trajectory(argin))
 
-        for motor_proxy, cmd_list in zip(self._proxies, cmd_lists):
-            print(motor_proxy, cmd_list)
-            motor_proxy.movevvc(cmd_list)
+    # -----------------------------------------------------------------------------
+    def MovevvcArray(self, argin):
+        """ Numeric version of movevvc
 
-    # --------------------------------------------------------
-    # real_motors_to_vm
-    # --------------------------------------------------------
+        :param : argin: [slew1, position1, slew2, position2, ...]
+        :type: PyTango.DevVarDoubleArray
+        :return:
+        :rtype: PyTango.DevVoid """
+        self.debug_stream("In MovevvcArray()")
 
-    def _real_motors_to_vm(self):
+        if len(argin) % 2:
+            PyTango.Except.throw_exception("MovevvcArray", "Trajectory must consist of (slew, position) pairs",
+                                           "SlitExecutor")
+
+        trajectory = np.reshape(argin, (-1, 2))
+        self._move_trajectory(trajectory[:, 0], trajectory[:, 1])
+
+    # -----------------------------------------------------------------------------
+    def _move_trajectory(self, slews, positions):
         ###
-        # this function returns the position of slit according to the current mode
+        # the whole trajectory is converted for all motors at once from one snapshot,
+        # motors, which have MovevvcArray get numeric trajectory, others - movevvc strings
         ###
-        p1 = self._proxies[0].Position
-        p2 = self._proxies[1].Position
+        self._group.command(*self._convert_trajectory(slews, positions, self._group.read(['Position'], use_cache=False)))
 
-        if str(self.Mode).lower() in ['g', 'gap']:
-            return p1 - p2
+    # -----------------------------------------------------------------------------
+    def _convert_trajectory(self, slews, positions, snapshot):
+        # returns (commands, arguments, indices of motors) for sub-motors of the first pair
 
-        elif str(self.Mode).lower() in ['p', 'pos', 'position']:
-            return (p1 + p2) / 2.
+        motors_positions = self._vm_to_real_motors(positions, snapshot)
 
-        else:
-            PyTango.Except.throw_exception("slit", "Unknown mode", "SlitExecutor")
+        # sub-motors, which are VMs themselves, accept numeric trajectories
+        numeric_trajectory = self._group.has_command('MovevvcArray')
 
+        commands = []
+        arguments = []
+        for index, motor_positions in zip(self._pairs[0], motors_positions):
+            numeric = numeric_trajectory[index]
+            if numeric:
+                commands.append('MovevvcArray')
+                arguments.append(np.column_stack((slews, motor_positions)).ravel())
+            else:
+                commands.append('movevvc')
+                arguments.append(['slew: {}, position: {}'.format(int(round(slew)), position)
+                                  for slew, position in zip(slews, motor_positions)])
 
-    # --------------------------------------------------------
-    # vm_to_real_motors
-    # --------------------------------------------------------
+        return commands, arguments, self._pairs[0]
+
+    # -----------------------------------------------------------------------------
+    def AppendTrajectory(self, argin):
+        """ Appends segment to the streamed trajectory. Segments are converted at once and sent to sub-motors
+        in chunks of TrajectoryChunk points. Plain sub-motors (movevvc) get each chunk as soon as the previous
+        one is done, so the motion stops between chunks. Sub-motors, which have AppendTrajectory themselves,
+        get each chunk at once and move through the chunks without stops
+
+        :param : argin: [slew1, position1, slew2, position2, ...]
+        :type: PyTango.DevVarDoubleArray
+        :return:
+        :rtype: PyTango.DevVoid """
+        self.debug_stream("In AppendTrajectory()")
+
+        if len(argin) % 2:
+            PyTango.Except.throw_exception("AppendTrajectory", "Trajectory must consist of (slew, position) pairs",
+                                           "SlitExecutor")
+
+        trajectory = np.reshape(argin, (-1, 2))
+
+        with self._stream_lock:
+            # the trajectory moves VM along the coupling, which does not change the part of motor positions,
+            # taken from snapshot, so the snapshot taken at the start of stream is valid for all segments
+            if self._stream_snapshot is None:
+                self._stream_snapshot = self._group.read(['Position'], use_cache=False)
+
+            chunk = max(int(self.TrajectoryChunk), 1)
+            for start in range(0, len(trajectory), chunk):
+                points = trajectory[start:start + chunk]
+                self._stream.append((len(points),
+                                     self._convert_trajectory(points[:, 0], points[:, 1], self._stream_snapshot),
+                                     self._vm_to_real_motors(points[-1, 1], self._stream_snapshot)))
+                self._stream_points += len(points)
+
+            if self._stream_thread is None:
+                self._stream_thread = threading.Thread(target=self._feed_trajectory_stream)
+                self._stream_thread.daemon = True
+                self._stream_thread.start()
+
+    # -----------------------------------------------------------------------------
+    def MoveTo(self, argin):
+        """ Starts move of VM and returns immediately. As soon as all sub-motors have stopped,
+        user event of MoveResult is pushed
+
+        :param : argin: new position
+        :type: PyTango.DevDouble
+        :return:
+        :rtype: PyTango.DevVoid """
+        self.debug_stream("In MoveTo()")
+
+        targets = self._move_pair(argin)
+        self._move_result = ''
+
+        thread = threading.Thread(target=self._watch_move, args=(targets, self._pairs[0]))
+        thread.daemon = True
+        thread.start()
+
+    # -----------------------------------------------------------------------------
+    def is_MoveTo_allowed(self):
+        self.debug_stream("In is_MoveTo_allowed()")
+        return self.get_state() not in [PyTango.DevState.MOVING, PyTango.DevState.FAULT]
+
+    # -----------------------------------------------------------------------------
+    def _watch_move(self, targets, indices):
+        # waits for the end of move, started by MoveTo, and reports final position and error, if any
+
+        error = ''
+        try:
+            self._wait_move_done(targets, indices)
+
+            state = self._get_state()
+            if state in [PyTango.DevState.FAULT, PyTango.DevState.ALARM]:
+                error = 'sub-motors are in {}'.format(state)
+
+            position = self._real_motors_to_vm(self._group.read(['Position'], use_cache=False))
+        except PyTango.DevFailed as err:
+            position = np.nan
+            error = err.args[0].desc
+
+        self._move_result = 'position: {}, error: {}'.format(position, error)
+        self.push_event('MoveResult', [], [], self._move_result)
+
+    # -----------------------------------------------------------------------------
+    def read_MoveResult(self, attr):
+
+        self.debug_stream("In read_MoveResult()")
+        attr.set_value(self._move_result)
+
+    # -----------------------------------------------------------------------------
+    def StepScan(self, argin):
+        """ Starts step scan, executed by the device: VM moves through the positions, waits the dwell time
+        at each of them and pushes user event of ScanPoint as soon as the point is reached
+
+        :param : argin: [position1, dwell1, position2, dwell2, ...], dwell in seconds
+        :type: PyTango.DevVarDoubleArray
+        :return:
+        :rtype: PyTango.DevVoid """
+        self.debug_stream("In StepScan()")
+
+        if len(argin) == 0 or len(argin) % 2:
+            PyTango.Except.throw_exception("StepScan", "Scan must consist of (position, dwell) pairs", "SlitExecutor")
+
+        if self._scan_thread is not None:
+            PyTango.Except.throw_exception("StepScan", "Another scan is running", "SlitExecutor")
+
+        scan = np.reshape(argin, (-1, 2))
 
-    def _vm_to_real_motors(self, new_position):
         ###
-        # this function returns the position real motors from the position of slits according to the current mode
+        # all points are converted and checked against limits at once, from one snapshot
         ###
+        snapshot = self._group.read(LIMITS_SNAPSHOT, use_cache=False)
+        targets = self._vm_to_real_motors(scan[:, 0], snapshot)
+
+        motors = self._pairs[0]
+        out_of_limits = (targets.T < snapshot['UnitLimitMin'][motors]) | (targets.T > snapshot['UnitLimitMax'][motors])
+        if np.any(out_of_limits):
+            PyTango.Except.throw_exception("StepScan",
+                                           "Points {} are out of limits".format(
+                                               list(np.flatnonzero(np.any(out_of_limits, axis=1)))),
+                                           "SlitExecutor")
+
+        self._scan_stop.clear()
+        self._scan_point = [-1, np.nan]
+        self._scan_thread = threading.Thread(target=self._run_step_scan, args=(targets, scan[:, 1]))
+        self._scan_thread.daemon = True
+        self._scan_thread.start()
 
-        if str(self.Mode).lower() in ['g', 'gap']:
-            delta = (new_position - self._real_motors_to_vm())/2.
-            return self._proxies[0].Position + delta, self._proxies[1].Position - delta
+    # -----------------------------------------------------------------------------
+    def is_StepScan_allowed(self):
+        self.debug_stream("In is_StepScan_allowed()")
+        return self.get_state() not in [PyTango.DevState.MOVING, PyTango.DevState.FAULT]
 
-        elif str(self.Mode).lower() in ['p', 'pos', 'position']:
-            delta = new_position - self._real_motors_to_vm()
-            return self._proxies[0].Position + delta, self._proxies[1].Position + delta
-        else:
+    # -----------------------------------------------------------------------------
+    def _run_step_scan(self, targets, dwells):
+        # moves sub-motors from point to point, stops after the last point or by StopMove
+
+        try:
+            for index, dwell in enumerate(dwells):
+                if self._scan_stop.is_set():
+                    break
+
+                self._group.write('Position', targets[:, index], self._pairs[0])
+                self._wait_move_done(targets[:, index], self._pairs[0])
+
+                self._scan_point = [index, self._real_motors_to_vm()]
+                self.push_event('ScanPoint', [], [], self._scan_point)
+
+                self._scan_stop.wait(dwell)
+        except PyTango.DevFailed as err:
+            self.error_stream("Step scan is aborted: {}".format(err))
+        finally:
+            self._scan_thread = None
+
+    # -----------------------------------------------------------------------------
+    def read_ScanPoint(self, attr):
+
+        self.debug_stream("In read_ScanPoint()")
+        attr.set_value(self._scan_point)
+
+    # -----------------------------------------------------------------------------
+    def read_TrajectoryBuffer(self, attr):
+
+        self.debug_stream("In read_TrajectoryBuffer()")
+        attr.set_value(self._stream_points)
+
+    # -----------------------------------------------------------------------------
+    def _feed_trajectory_stream(self):
+        ###
+        # sends chunks of streamed trajectory to sub-motors one by one. Plain sub-motors (movevvc) get the next chunk
+        # only after the previous one is done, so they stop at the end of every chunk. Sub-motors, which stream
+        # trajectories themselves, get every chunk to their AppendTrajectory as soon as it is queued and keep moving
+        # between chunks, then the stream stays open (with its snapshot) till they stop
+        ###
+        forward = self._forwards_trajectory()
+        forwarded = None                    # (targets of the last forwarded chunk, time it was sent)
+
+        while True:
+            with self._stream_lock:
+                if not self._stream and forwarded is None:
+                    self._stream_snapshot = None
+                    self._stream_thread = None
+                    return
+                chunk = self._stream.popleft() if self._stream else None
+
+            if chunk is None:
+                if self._forwarded_stream_done(*forwarded):
+                    forwarded = None
+                continue
+
+            points, request, targets = chunk
+            try:
+                if forward:
+                    self._group.command('AppendTrajectory', request[1], request[2])
+                    forwarded = (targets, time.time())
+                else:
+                    self._group.command(*request)
+                    self._wait_move_done(targets, self._pairs[0])
+            except PyTango.DevFailed as err:
+                self.error_stream("Trajectory stream is aborted: {}".format(err))
+                self._stop_trajectory_stream()
+                forwarded = None
+
+            with self._stream_lock:
+                self._stream_points = max(self._stream_points - points, 0)
+
+    # -----------------------------------------------------------------------------
+    def _forwards_trajectory(self):
+        # True if all sub-motors of the trajectory stream trajectories themselves and accept numeric segments
+
+        appends = self._group.has_command('AppendTrajectory')
+        numeric = self._group.has_command('MovevvcArray')
+
+        return all(appends[index] and numeric[index] for index in self._pairs[0])
+
+    # -----------------------------------------------------------------------------
+    def _forwarded_stream_done(self, targets, sent):
+        # waits for State event or MOVE_POLL_PERIOD, then checks if sub-motors have done all forwarded chunks:
+        # none of them is MOVING and they are at the targets of the last chunk or did not start in MOVE_START_TIMEOUT
+
+        self._wait_state_event()
+
+        try:
+            snapshot = self._group.read(['State', 'Position'], use_cache=False)
+            if np.any(snapshot['State'] == PyTango.DevState.MOVING):
+                return False
+
+            return self._at_targets(snapshot['Position'], targets, self._pairs[0]) or \
+                time.time() - sent > MOVE_START_TIMEOUT
+        except PyTango.DevFailed as err:
+            self.error_stream("Trajectory stream is aborted: {}".format(err))
+            return True
+
+    # -----------------------------------------------------------------------------
+    def _stop_trajectory_stream(self):
+        # drops all not yet sent chunks, the feeder stops after the current one
+
+        with self._stream_lock:
+            self._stream.clear()
+            self._stream_points = 0
+            self._stream_snapshot = None
+
+    # -----------------------------------------------------------------------------
+    def _wait_move_done(self, targets=None, indices=None):
+        ###
+        # right after the write sub-motors can still be ON, so first the move start is confirmed, reading
+        # them directly: one of them is MOVING, or all of them are at targets (within one step), or
+        # MOVE_START_TIMEOUT has passed; then State is checked from cache each time a sub-motor sends State event,
+        # motors, which do not send events, are checked every MOVE_POLL_PERIOD
+        ###
+        deadline = time.time() + MOVE_START_TIMEOUT
+        while True:
+            snapshot = self._group.read(['State', 'Position'], use_cache=False)
+            if np.any(snapshot['State'] == PyTango.DevState.MOVING):
+                break
+
+            if targets is not None and self._at_targets(snapshot['Position'], targets, indices):
+                return
+
+            if time.time() > deadline:
+                return
+
+            self._wait_state_event()
+
+        states = snapshot['State']
+        while np.any(states == PyTango.DevState.MOVING):
+            self._wait_state_event()
+            states = self._group.read(['State'])['State']
+
+    # -----------------------------------------------------------------------------
+    def _wait_state_event(self):
+        # waits for State event of a sub-motor, but not longer than MOVE_POLL_PERIOD;
+        # the condition is held only here, so reads do not block the event callbacks
+
+        with self._state_changed:
+            self._state_changed.wait(MOVE_POLL_PERIOD)
+
+    # -----------------------------------------------------------------------------
+    def _at_targets(self, positions, targets, indices=None):
+        # True if sub-motors (all or indices) are at targets within one step
+
+        if indices is None:
+            indices = np.arange(len(self._group))
+
+        steps = 1./np.abs(self._group.read(['Conversion'])['Conversion'][indices])
+
+        return np.all(np.abs(positions[indices] - targets) <= steps)
+
+    # -----------------------------------------------------------------------------
+    def _parse_trajectory(self, argin):
+        # converts lines "slew: X, position: Y" to two arrays
+
+        slews = np.empty(len(argin), dtype=int)
+        positions = np.empty(len(argin))
+        for index, line in enumerate(argin):
+            slew, pos = line.split(',')
+            slews[index] = int(slew.split(':')[1].strip())
+            positions[index] = float(pos.split(':')[1].strip())
+
+        return slews, positions
+
+    # --------------------------------------------------------
+    # get_axis
+    # --------------------------------------------------------
+
+    def _get_axis(self, axis=None):
+        # axis of SLIT kinematics, by default - according to the mode
+
+        if axis is None:
+            axis = self._axis
+
+        if axis is None:
             PyTango.Except.throw_exception("slit", "Unknown mode", "SlitExecutor")
 
+        return axis
+
     # --------------------------------------------------------
-    # _get_limit_max
+    # real_motors_to_vm
     # --------------------------------------------------------
 
-    def _get_limit_max(self):
+    def _real_motors_to_vm(self, snapshot=None, pair=0, axis=None):
         ###
-        # this function returns the max limits of slits according to the current mode
+        # this function returns the gap or center (axis, by default - according to the mode) of slit (pair of motors)
         ###
-        if str(self.Mode).lower() in ['g', 'gap']:
-            distances_to_limit = (self._proxies[0].UnitLimitMax - self._proxies[0].Position,
-                                  self._proxies[1].Position - self._proxies[1].UnitLimitMin)
+        if snapshot is None:
+            snapshot = self._group.read(['Position'])
 
-            if distances_to_limit[0] != distances_to_limit[1]:
-                limit_max = self._real_motors_to_vm() + 2 * min(distances_to_limit)
-            else:
-                limit_max = self._proxies[0].UnitLimitMax - self._proxies[1].UnitLimitMin
-            return limit_max
+        return SLIT.forward(snapshot['Position'][self._pairs[pair]], self._get_axis(axis))
 
-        elif str(self.Mode).lower() in ['p', 'pos', 'position']:
-            distance_to_limit = []
-            for proxy in self._proxies:
-                distance_to_limit.append(proxy.UnitLimitMax - proxy.Position)
 
-            return self._real_motors_to_vm() + min(distance_to_limit)
+    # --------------------------------------------------------
+    # vm_to_real_motors
+    # --------------------------------------------------------
 
-        else:
-            PyTango.Except.throw_exception("slit", "Unknown mode", "SlitExecutor")
+    def _vm_to_real_motors(self, new_position, snapshot=None, pair=0, axis=None):
+        ###
+        # this function returns the position real motors from the gap or center of slit
+        ###
+        if snapshot is None:
+            snapshot = self._group.read(['Position'])
+
+        return SLIT.inverse(new_position, snapshot['Position'][self._pairs[pair]], self._get_axis(axis))
 
     # --------------------------------------------------------
-    # _get_limit_max
+    # _get_limits
     # --------------------------------------------------------
 
-    def _get_limit_min(self):
+    def _get_limits(self, snapshot=None, pair=0, axis=None):
         ###
-        # this function returns the max limits of slits according to the current mode
+        # this function returns (min, max) limits of slit gap or center, both from one snapshot
         ###
-        if str(self.Mode).lower() in ['g', 'gap']:
-            distances_to_limit = (self._proxies[0].Position - self._proxies[0].UnitLimitMin,
-                                  self._proxies[1].UnitLimitMax - self._proxies[1].Position)
+        if snapshot is None:
+            snapshot = self._group.read(LIMITS_SNAPSHOT)
 
-            if distances_to_limit[0] != distances_to_limit[1]:
-                limit_min = self._real_motors_to_vm() - 2 * min(distances_to_limit)
-            else:
-                limit_min = self._proxies[0].UnitLimitMin - self._proxies[1].UnitLimitMax
-            return limit_min
+        axis = self._get_axis(axis)
+        motors = self._pairs[pair]
+        inputs = np.concatenate([snapshot[name][motors] for name in LIMITS_SNAPSHOT])
 
-        elif str(self.Mode).lower() in ['p', 'pos', 'position']:
-            distance_to_limit = []
-            for proxy in self._proxies:
-                distance_to_limit.append(proxy.UnitLimitMin - proxy.Position)
+        cached = self._limits_cache.get((pair, axis))
+        if cached is not None and np.array_equal(cached[0], inputs):
+            return cached[1]
 
-            return self._real_motors_to_vm() + min(distance_to_limit)
+        limits = tuple(float(limit) for limit in SLIT.limits(snapshot['Position'][motors],
+                                                             snapshot['UnitLimitMin'][motors],
+                                                             snapshot['UnitLimitMax'][motors], axis))
+        self._limits_cache[(pair, axis)] = (inputs, limits)
 
-        else:
-            PyTango.Except.throw_exception("slit", "Unknown mode", "SlitExecutor")
+        return limits
 
 
 class SlitExecutorClass(PyTango.DeviceClass):
@@ -623,11 +1301,11 @@ class SlitExecutorClass(PyTango.DeviceClass):
     device_property_list = {
         'Direction':
             [PyTango.DevString,
-             "The direction of movement (Horizontal/Vertical)",
+             "The direction of movement (Horizontal/Vertical/Both - four-blade slit)",
              ["None"]],
         'Mode':
             [PyTango.DevString,
-             "The movement mode (Gap/Position)",
+             "The movement mode (Gap/Position), in four-blade mode it is the mode of Position (horizontal)",
              ["None"]],
         'Left':
             [PyTango.DevString,
@@ -649,6 +1327,31 @@ class SlitExecutorClass(PyTango.DeviceClass):
             [PyTango.DevVarStringArray,
              "Array of strings: AttributeName, type, rd",
              [None]],
+        'TrajectoryChunk':
+            [PyTango.DevLong,
+             "Number of points of the streamed trajectory, sent to sub-motors at once. "
+             "Plain sub-motors (movevvc) stop at the end of each chunk",
+             [100]],
+        'CacheMaxAge':
+            [PyTango.DevDouble,
+             "Max age (s) of sub-motors Position/State, received by events, before they are read directly (0 - no limit)",
+             [0]],
+        'EventAbsChange':
+            [PyTango.DevDouble,
+             "Absolute change of Position, needed to push an event (0 - not used)",
+             [0]],
+        'EventRelChange':
+            [PyTango.DevDouble,
+             "Relative change (%) of Position, needed to push an event (0 - not used)",
+             [0]],
+        'PollPeriodMoving':
+            [PyTango.DevDouble,
+             "Period (s) of background polling of sub-motors, while one of them is moving",
+             [0.1]],
+        'PollPeriodIdle':
+            [PyTango.DevDouble,
+             "Period (s) of background polling of sub-motors, while no one is moving (0 - no polling)",
+             [0]],
     }
 
     #    Command definitions
@@ -662,6 +1365,30 @@ class SlitExecutorClass(PyTango.DeviceClass):
         'movevvc':
             [[PyTango.DevVarStringArray, "none"],
              [PyTango.DevVoid, "none"]],
+        'SimulateTrajectory':
+            [[PyTango.DevVarDoubleArray, "VM positions"],
+             [PyTango.DevVarDoubleArray, "[motor1, ..., motorN, out of limits] for each point"]],
+        'EqualizeSettings':
+            [[PyTango.DevVoid, "none"],
+             [PyTango.DevVoid, "none"]],
+        'SetMotionProfile':
+            [[PyTango.DevVarDoubleStringArray, "[[values], [names of speed parameters]]"],
+             [PyTango.DevVoid, "none"]],
+        'SetSlit':
+            [[PyTango.DevVarDoubleArray, "[HGap, HCenter, VGap, VCenter]"],
+             [PyTango.DevVoid, "none"]],
+        'MovevvcArray':
+            [[PyTango.DevVarDoubleArray, "[slew1, position1, slew2, position2, ...]"],
+             [PyTango.DevVoid, "none"]],
+        'AppendTrajectory':
+            [[PyTango.DevVarDoubleArray, "[slew1, position1, slew2, position2, ...]"],
+             [PyTango.DevVoid, "none"]],
+        'MoveTo':
+            [[PyTango.DevDouble, "New position"],
+             [PyTango.DevVoid, "none"]],
+        'StepScan':
+            [[PyTango.DevVarDoubleArray, "[position1, dwell1, position2, dwell2, ...], dwell in s"],
+             [PyTango.DevVoid, "none"]],
     }
 
     #    Attribute definitions
@@ -686,6 +1413,37 @@ class SlitExecutorClass(PyTango.DeviceClass):
             [[PyTango.DevDouble,
               PyTango.SCALAR,
               PyTango.READ]],
+        'Limits':
+            [[PyTango.DevDouble,
+              PyTango.SPECTRUM,
+              PyTango.READ, 2],
+             {'description': "[UnitLimitMin, UnitLimitMax] of Position"}],
+        'StartSkew':
+            [[PyTango.DevDouble,
+              PyTango.SCALAR,
+              PyTango.READ],
+             {'unit': 'ms',
+              'description': "Time between dispatch of the Position write to the first and the last "
+                             "sub-motor in the last move, measured on the client side"}],
+        'TrajectoryBuffer':
+            [[PyTango.DevLong,
+              PyTango.SCALAR,
+              PyTango.READ],
+             {'description': "Number of points of the streamed trajectory, which are not yet done (not yet "
+                             "forwarded for sub-motors with AppendTrajectory). Plain sub-motors get a chunk only "
+                             "after the previous one is done, so their motion stops between chunks"}],
+        'MoveResult':
+            [[PyTango.DevString,
+              PyTango.SCALAR,
+              PyTango.READ],
+             {'description': "'position: X, error: Y' of the last MoveTo, empty while moving; "
+                             "user event is pushed at the end of move"}],
+        'ScanPoint':
+            [[PyTango.DevDouble,
+              PyTango.SPECTRUM,
+              PyTango.READ, 2],
+             {'description': "[index, position] of the last point of step scan, reached by VM; "
+                             "user event is pushed for each point"}],
         'PositionSim':
             [[PyTango.DevDouble,
               PyTango.SCALAR,
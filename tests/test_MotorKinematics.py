@@ -0,0 +1,154 @@
+#!/usr/bin/env python
+# -*- coding:utf-8 -*-
+
+"""
+Unit tests of MotorKinematics: forward/inverse transforms and limits of VM axes
+"""
+
+import os
+import sys
+import unittest
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from MotorKinematics import LinearKinematics, NonlinearKinematics, SLIT, SLIT_GAP, SLIT_CENTER
+
+
+# -----------------------------------------------------------------------------
+class TestSlit(unittest.TestCase):
+
+    def setUp(self):
+        # first blade at 3, second at -1: gap 4, center 1
+        self.positions = np.array([3., -1.])
+        self.limits_min = np.array([-10., -10.])
+        self.limits_max = np.array([10., 10.])
+
+    def test_forward(self):
+        self.assertEqual(SLIT.forward(self.positions, SLIT_GAP), 4.)
+        self.assertEqual(SLIT.forward(self.positions, SLIT_CENTER), 1.)
+        np.testing.assert_array_equal(SLIT.forward(self.positions), [4., 1.])
+
+    def test_inverse_gap(self):
+        # gap opens symmetrically, center stays, coupling is exact
+        np.testing.assert_array_equal(SLIT.inverse(6., self.positions, SLIT_GAP), [4., -2.])
+
+    def test_inverse_center(self):
+        np.testing.assert_array_equal(SLIT.inverse(2., self.positions, SLIT_CENTER), [4., 0.])
+
+    def test_inverse_points(self):
+        motors = SLIT.inverse([2., 4., 6.], self.positions, SLIT_GAP)
+        self.assertEqual(motors.shape, (2, 3))
+        np.testing.assert_array_equal(SLIT.forward(motors, SLIT_GAP), [2., 4., 6.])
+        np.testing.assert_array_equal(SLIT.forward(motors, SLIT_CENTER), [1., 1., 1.])
+
+    def test_inverse_axes(self):
+        np.testing.assert_array_equal(SLIT.inverse_axes([6., 2.], self.positions), [5., -1.])
+
+    def test_limits_gap(self):
+        # center 1: the first blade reaches 10 at gap 18, the second reaches 10 at gap -18
+        self.assertEqual(SLIT.limits(self.positions, self.limits_min, self.limits_max, SLIT_GAP), (-18., 18.))
+
+    def test_limits_center(self):
+        # gap 4: the second blade reaches -10 at center -8, the first one reaches 10 at center 8
+        self.assertEqual(SLIT.limits(self.positions, self.limits_min, self.limits_max, SLIT_CENTER), (-8., 8.))
+
+
+# -----------------------------------------------------------------------------
+class TestThetaTwoTheta(unittest.TestCase):
+
+    def setUp(self):
+        # axis is theta, 2theta follows with double shift
+        self.kinematics = LinearKinematics([[1., 0.]], [[1.], [2.]])
+        self.positions = np.array([1., 2.])
+
+    def test_forward(self):
+        self.assertEqual(self.kinematics.forward(self.positions, 0), 1.)
+
+    def test_inverse(self):
+        np.testing.assert_array_equal(self.kinematics.inverse(3., self.positions), [3., 6.])
+
+    def test_limits(self):
+        # 2theta is the nearest one: reaches 10 at theta 5 and -10 at theta -5
+        self.assertEqual(self.kinematics.limits(self.positions, np.array([-10., -10.]), np.array([10., 10.])),
+                         (-5., 5.))
+
+
+# -----------------------------------------------------------------------------
+class TestThreeLegs(unittest.TestCase):
+
+    def setUp(self):
+        # tilt table: height, pitch and roll of three legs, coupling is the pseudo inverse
+        self.kinematics = LinearKinematics([[1./3, 1./3, 1./3], [1., -0.5, -0.5], [0., 1., -1.]])
+        self.positions = np.array([1., 2., -3.])
+        self.limits_min = np.array([-5., -5., -5.])
+        self.limits_max = np.array([5., 5., 5.])
+
+    def test_len(self):
+        self.assertEqual(len(self.kinematics), 3)
+
+    def test_inverse_moves_one_axis(self):
+        axes = self.kinematics.forward(self.positions)
+        for axis in range(3):
+            expected = axes.copy()
+            expected[axis] += 0.7
+            motors = self.kinematics.inverse(expected[axis], self.positions, axis)
+            np.testing.assert_allclose(self.kinematics.forward(motors), expected, atol=1e-12)
+
+    def test_inverse_axes(self):
+        motors = self.kinematics.inverse_axes([0.5, -1., 2.], self.positions)
+        np.testing.assert_allclose(self.kinematics.forward(motors), [0.5, -1., 2.], atol=1e-12)
+
+    def test_limits(self):
+        # at each limit all legs are within their limits and at least one leg touches its limit
+        for axis in range(3):
+            for limit in self.kinematics.limits(self.positions, self.limits_min, self.limits_max, axis):
+                motors = self.kinematics.inverse(limit, self.positions, axis)
+                self.assertTrue(np.all(motors >= self.limits_min - 1e-9))
+                self.assertTrue(np.all(motors <= self.limits_max + 1e-9))
+                self.assertTrue(np.any(np.isclose(motors, self.limits_min) | np.isclose(motors, self.limits_max)))
+
+
+# -----------------------------------------------------------------------------
+class TestBragg(unittest.TestCase):
+
+    def setUp(self):
+        # z = 100*sin(theta), theta in degrees, motor limits are +-60
+        self.kinematics = NonlinearKinematics(lambda positions: 100*np.sin(np.radians(positions)),
+                                              lambda axes, positions: np.degrees(np.arcsin(axes/100.)))
+        self.positions = np.array([30.])
+        self.limits_min = np.array([-60.])
+        self.limits_max = np.array([60.])
+
+    def test_forward(self):
+        self.assertAlmostEqual(self.kinematics.forward(self.positions, 0), 50.)
+
+    def test_inverse(self):
+        np.testing.assert_allclose(self.kinematics.inverse([0., 50., 100.], self.positions), [[0., 30., 90.]])
+
+    def test_limits(self):
+        # exact limits, not the estimate, linearized at 30 degrees
+        min_value, max_value = self.kinematics.limits(self.positions, self.limits_min, self.limits_max)
+        self.assertAlmostEqual(min_value, -100*np.sin(np.radians(60.)), places=9)
+        self.assertAlmostEqual(max_value, 100*np.sin(np.radians(60.)), places=9)
+
+        for limit in (min_value, max_value):
+            motors = self.kinematics.inverse(limit, self.positions)
+            self.assertTrue(np.all(motors >= self.limits_min) and np.all(motors <= self.limits_max))
+
+
+# -----------------------------------------------------------------------------
+class TestWrongMatrices(unittest.TestCase):
+
+    def test_not_inverse(self):
+        with self.assertRaises(ValueError):
+            LinearKinematics([[1., -1.], [0.5, 0.5]], [[1., 1.], [-1., 1.]])
+
+    def test_wrong_shape(self):
+        with self.assertRaises(ValueError):
+            LinearKinematics([[1., -1.], [0.5, 0.5]], [[0.5, -0.5]])
+
+
+if __name__ == '__main__':
+    unittest.main()
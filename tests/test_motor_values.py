@@ -0,0 +1,81 @@
+#!/usr/bin/env python
+# -*- coding:utf-8 -*-
+
+"""
+Unit tests of conversion of VM speed parameters to values of sub-motors (SlitExecutor, CombinedMotor):
+integer attributes of sub-motors must be written as integers
+"""
+
+import os
+import sys
+import unittest
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+try:
+    import PyTango
+except ImportError:
+    PyTango = None
+
+if PyTango is not None:
+    import CombinedMotor
+    import SlitExecutor
+
+
+class _Device(object):
+    # stands for the device: only the members, used by _motor_values
+
+    def __init__(self, **members):
+        self.__dict__.update(members)
+
+
+# -----------------------------------------------------------------------------
+@unittest.skipIf(PyTango is None, 'PyTango is not installed')
+class TestCombinedMotor(unittest.TestCase):
+
+    def setUp(self):
+        # th - 2th: coupling 1 and 2
+        self.device = _Device(_speed_coefficients=lambda snapshot: (np.array([1., 2.]), np.array([1., 0.])))
+
+    def test_integer_attribute(self):
+        snapshot = {'SlewRate': np.array([1000, -1000]), 'Conversion': np.array([3., 3.]),
+                    'Position': np.array([0., 0.])}
+        values = CombinedMotor.CombinedMotor._motor_values(self.device, 'SlewRate', 5000, snapshot)
+
+        self.assertTrue(np.issubdtype(values.dtype, np.integer))
+        np.testing.assert_array_equal(values, [2, -3])
+
+    def test_float_attribute(self):
+        snapshot = {'SlewRate': np.array([1000., 1000.]), 'Conversion': np.array([3., 3.]),
+                    'Position': np.array([0., 0.])}
+        values = CombinedMotor.CombinedMotor._motor_values(self.device, 'SlewRate', 5000, snapshot)
+
+        np.testing.assert_allclose(values, [1.5, 3.])
+
+
+# -----------------------------------------------------------------------------
+@unittest.skipIf(PyTango is None, 'PyTango is not installed')
+class TestSlitExecutor(unittest.TestCase):
+
+    def setUp(self):
+        self.device = _Device(_axis=SlitExecutor.SLIT_GAP, _group=[None, None])
+
+    def test_integer_attribute(self):
+        # gap speed is shared by two blades
+        values = SlitExecutor.SlitExecutor._motor_values(self.device, 'SlewRate', 1001,
+                                                         {'SlewRate': np.array([400, -400])})
+
+        self.assertTrue(np.issubdtype(values.dtype, np.integer))
+        np.testing.assert_array_equal(values, [500, -500])
+
+    def test_flag(self):
+        values = SlitExecutor.SlitExecutor._motor_values(self.device, 'FlagClosedLoop', 1,
+                                                         {'FlagClosedLoop': np.array([0, 0])})
+
+        self.assertEqual(values, [1, 1])
+
+
+if __name__ == '__main__':
+    unittest.main()